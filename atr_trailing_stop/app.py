@@ -1,57 +1,60 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import streamlit as st
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+import atr_engine
+from atr_sweep import sweep_trailing_stop
+from downsample import lttb
 
-# Function to calculate True Range
-def calculate_true_range(high, low, previous_close):
-    tr = max(high - low, abs(high - previous_close), abs(low - previous_close))
-    return tr
+import market_data_cache
+from bar_resampler import load_resampled
+from result_cache import ResultCache
+
+# Bar sizes offered in the sidebar, finest first
+INTERVALS = ['1m', '5m', '15m', '30m', '1h', '1d', '1wk', '1mo']
 
 # Function to calculate ATR using the exponential moving average (smoothing method shown in the formula)
 def calculate_atr(highs, lows, closes, period):
-    atr_values = []
-    previous_atr = 0
-
     if len(highs) < period:
         return [float('NaN')] * len(highs)
 
-    for i in range(len(highs)):
-        if i == 0:
-            true_ranges = [calculate_true_range(highs.iloc[j], lows.iloc[j], closes.iloc[j-1] if j > 0 else closes.iloc[0]) for j in range(min(period, len(highs)))]
-            previous_atr = sum(true_ranges) / period
-            atr_values.append(previous_atr)
-        else:
-            current_tr = calculate_true_range(highs.iloc[i], lows.iloc[i], closes.iloc[i-1])
-            current_atr = (previous_atr * (period - 1) + current_tr) / period
-            atr_values.append(current_atr)
-            previous_atr = current_atr
-
+    atr_values = atr_engine.atr(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), period)
     return pd.Series(atr_values, index=highs.index)
 
 # Function to calculate the trailing stop loss for both long and short positions
 def calculate_trailing_stop(df, multiplier, atr_period):
-    atr = df['ATR']
-    ts = atr * multiplier
-
-    atr_ts = pd.Series(np.nan, index=df.index)
-
-    for i in range(1, len(df)):
-        if df['Close'].iloc[i] > atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
-            if df['Close'].iloc[i-1] > atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
-                atr_ts.iloc[i] = max(atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else df['Close'].iloc[i] - ts.iloc[i], df['Close'].iloc[i] - ts.iloc[i])
-            else:
-                atr_ts.iloc[i] = df['Close'].iloc[i] - ts.iloc[i]
-        elif df['Close'].iloc[i] < atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
-            if df['Close'].iloc[i-1] < atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
-                atr_ts.iloc[i] = min(atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else df['Close'].iloc[i] + ts.iloc[i], df['Close'].iloc[i] + ts.iloc[i])
-            else:
-                atr_ts.iloc[i] = df['Close'].iloc[i] + ts.iloc[i]
-        else:
-            atr_ts.iloc[i] = atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else df['Close'].iloc[i] - ts.iloc[i]
-
-    return atr_ts
+    stop, _, _ = atr_engine.trailing_stop(df['Close'].to_numpy(), np.asarray(df['ATR'], dtype=np.float64), multiplier)
+    return pd.Series(stop, index=df.index)
+
+# Cached stages: each one is keyed only on the inputs it depends on, so changing
+# the multiplier reuses the downloaded bars and the ATR. max_entries bounds the
+# caches, least recently used entries are evicted first.
+# Bars are downloaded at `interval`, or built from the cached `resample_from` feed.
+@st.cache_data(max_entries=32)
+def load_data(symbol, start_date, end_date, interval='1d', resample_from=None):
+    if resample_from:
+        df = load_resampled(symbol, start_date, end_date, interval=interval, source_interval=resample_from)
+    else:
+        df = market_data_cache.download(symbol, start=start_date, end=end_date, interval=interval)
+    if df.empty:
+        return df
+    return df.round(2).drop(columns='Volume')
+
+@st.cache_data(max_entries=64)
+def load_atr(symbol, start_date, end_date, atr_period, interval='1d', resample_from=None):
+    df = load_data(symbol, start_date, end_date, interval, resample_from)
+    return calculate_atr(df['High'], df['Low'], df['Close'], atr_period)
+
+@st.cache_data(max_entries=16)
+def load_sweep(symbol, start_date, end_date, periods, multipliers, interval='1d', resample_from=None):
+    df = load_data(symbol, start_date, end_date, interval, resample_from)
+    _, _, summary = sweep_trailing_stop(df['High'], df['Low'], df['Close'], periods, multipliers)
+    return summary
+
+# One trailing stop result cache per server process, shared by all sessions
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_entries=128)
 
 # Streamlit app
 def app():
@@ -62,9 +65,26 @@ def app():
     symbol = st.sidebar.text_input("Ticker Symbol", "AAPL")
     start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2024-01-01"))
     end_date = st.sidebar.date_input("End Date", pd.to_datetime("today"))
+    interval = st.sidebar.selectbox("Interval", INTERVALS, index=INTERVALS.index('1d'))
+    resample_from = st.sidebar.selectbox("Resample From", ['None'] + INTERVALS[:INTERVALS.index(interval)],
+                                         help="Build the bars from a finer cached feed instead of downloading them")
+    resample_from = None if resample_from == 'None' else resample_from
     atr_period = st.sidebar.number_input("ATR Period", min_value=1, max_value=100, value=21)
     multiplier = st.sidebar.number_input("Multiplier", min_value=1.0, max_value=10.0, value=3.0, step=0.1)
 
+    # Sidebar Inputs for chart rendering
+    st.sidebar.title("Display")
+    chart_points = st.sidebar.number_input("Chart Points", min_value=100, max_value=20000, value=2000, step=100)
+    page_size = st.sidebar.selectbox("Table Rows per Page", [50, 100, 250, 500], index=1)
+
+    # Sidebar Inputs for the parameter sweep
+    st.sidebar.title("Parameter Sweep")
+    show_sweep = st.sidebar.checkbox("Show parameter sweep heatmap", value=False)
+    sweep_periods = st.sidebar.slider("ATR Period Range", min_value=1, max_value=100, value=(5, 50))
+    sweep_period_step = st.sidebar.number_input("ATR Period Step", min_value=1, max_value=50, value=5)
+    sweep_multipliers = st.sidebar.slider("Multiplier Range", min_value=1.0, max_value=10.0, value=(1.0, 5.0), step=0.1)
+    sweep_multiplier_step = st.sidebar.number_input("Multiplier Step", min_value=0.1, max_value=5.0, value=0.5, step=0.1)
+
     # Sidebar for formulas in LaTeX
     st.sidebar.title("Formulas")
 
@@ -102,28 +122,66 @@ def app():
     st.sidebar.write("The trend is identified based on the position of the closing price relative to the ATR trailing stop. If the price is above the trailing stop, it is a long trend, otherwise, it is a short trend.")
 
     # Download data and calculate ATR and trailing stop loss
-    df = yf.download(symbol, start=start_date, end=end_date)
+    df = load_data(symbol, start_date, end_date, interval, resample_from)
 
     if not df.empty:
-        df = df.round(2).drop(columns='Volume')
-        df['ATR'] = calculate_atr(df['High'], df['Low'], df['Close'], atr_period)
-        df['ATR_Trailing_Stop'] = calculate_trailing_stop(df, multiplier, atr_period)
+        df['ATR'] = load_atr(symbol, start_date, end_date, atr_period, interval, resample_from)
+
+        # Reuse the stop for identical parameters computed from the same cached bars
+        result_cache = get_result_cache()
+        key = ('atr_trailing_stop', symbol, multiplier, atr_period, str(start_date), str(end_date), interval,
+               resample_from)
+        df['ATR_Trailing_Stop'] = result_cache.get_or_compute(
+            key, lambda: calculate_trailing_stop(df, multiplier, atr_period), end_date,
+            version=lambda: market_data_cache.data_version(symbol, resample_from or interval))
+        with st.sidebar.expander("Result Cache"):
+            st.json(result_cache.stats())
 
         # Display Title and Header
-        st.header(f"ATR Trailing Stop for {symbol}")
-
-        # Plot chart
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(df.index, df['Close'], label='Close Price', color='blue')
-        ax.plot(df.index, df['ATR_Trailing_Stop'], label='ATR Trailing Stop', color='red', linestyle='--')
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Price")
-        ax.legend()
-        ax.set_title(f"{symbol} - ATR Trailing Stop Chart")
-        st.pyplot(fig)
-
-        # Show Data Table
-        st.write(df[['High', 'Low', 'Close', 'ATR', 'ATR_Trailing_Stop']])
+        st.header(f"ATR Trailing Stop for {symbol} ({interval})")
+
+        # Zoom window: the selected range is re-downsampled at full detail
+        first_date, last_date = df.index[0].date(), df.index[-1].date()
+        if first_date < last_date:
+            window = st.slider("Chart Window", min_value=first_date, max_value=last_date, value=(first_date, last_date))
+        else:
+            window = (first_date, last_date)
+        visible = df[(df.index >= pd.Timestamp(window[0])) & (df.index < pd.Timestamp(window[1]) + pd.Timedelta(days=1))]
+
+        # Plot chart, each line downsampled to a pixel-appropriate point count
+        close = lttb(visible['Close'], chart_points)
+        stop = lttb(visible['ATR_Trailing_Stop'], chart_points)
+        fig = go.Figure()
+        fig.add_trace(go.Scattergl(x=close.index, y=close, name='Close Price', line=dict(color='blue')))
+        fig.add_trace(go.Scattergl(x=stop.index, y=stop, name='ATR Trailing Stop', line=dict(color='red', dash='dash')))
+        fig.update_layout(title=f"{symbol} - ATR Trailing Stop Chart", xaxis_title="Date", yaxis_title="Price", height=600)
+        st.plotly_chart(fig, width='stretch')
+        st.caption(f"Showing {len(close)} of {visible['Close'].count()} bars.")
+
+        # Show Data Table one page at a time
+        table = df[['High', 'Low', 'Close', 'ATR', 'ATR_Trailing_Stop']]
+        page_count = max(1, -(-len(table) // page_size))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=page_count)
+        st.dataframe(table.iloc[(page - 1) * page_size:page * page_size])
+        st.caption(f"Page {page} of {page_count} ({len(table)} rows).")
+
+        # Parameter sweep heatmap over the same downloaded bars
+        if show_sweep:
+            periods = np.arange(sweep_periods[0], sweep_periods[1] + 1, sweep_period_step)
+            multipliers = np.round(np.arange(sweep_multipliers[0], sweep_multipliers[1] + 1e-9, sweep_multiplier_step), 2)
+            summary = load_sweep(symbol, start_date, end_date, tuple(periods.tolist()), tuple(multipliers.tolist()),
+                                 interval, resample_from)
+
+            st.header(f"Parameter Sweep for {symbol}")
+            metric = st.selectbox("Heatmap Metric", list(summary.columns))
+            grid = summary[metric].unstack('Multiplier')
+
+            fig = go.Figure(go.Heatmap(z=grid.to_numpy(), x=[str(m) for m in grid.columns], y=[str(p) for p in grid.index],
+                                       colorscale='RdYlGn', colorbar=dict(title=metric)))
+            fig.update_layout(title=f"{symbol} - {metric}", xaxis_title="Multiplier", yaxis_title="ATR Period", height=600)
+            st.plotly_chart(fig, width='stretch')
+
+            st.write(summary)
 
     else:
         st.write("No data available for the selected inputs.")
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from atr_panel import calculate_panel_trailing_stop
+
+# Function to turn the engine's long/short flags into a side array (1 long, -1 short, 0 flat)
+def sides_from_flags(is_long, is_short):
+    return np.asarray(is_long, dtype=np.int8) - np.asarray(is_short, dtype=np.int8)
+
+# Function to turn nb_atrts' Long_Stop/Short_Stop arrays (NaN off-side) into a side array
+def sides_from_stops(long_stop, short_stop):
+    return (~np.isnan(long_stop)).astype(np.int8) - (~np.isnan(short_stop)).astype(np.int8)
+
+# Function to backtest side signals over a (symbols, bars) close panel.
+# The side decided on a bar's close is held over the next bar, every change of
+# side is a trade boundary, and `cost` is charged per unit of position turnover.
+# Everything is computed with whole-panel array operations, no per-symbol loop.
+def backtest(close, sides, symbols=None, dates=None, allow_short=True, cost=0.0):
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    sides = np.atleast_2d(np.asarray(sides, dtype=np.int8))
+    n_symbols, n_bars = close.shape
+    symbols = list(range(n_symbols)) if symbols is None else list(symbols)
+    dates = np.arange(n_bars) if dates is None else np.asarray(dates)
+
+    if not allow_short:
+        sides = np.maximum(sides, 0)
+
+    # Bar returns and the position held over each bar
+    bar_returns = np.zeros_like(close)
+    bar_returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+    bar_returns[~np.isfinite(bar_returns)] = 0.0
+    position = np.zeros(sides.shape, dtype=np.int8)
+    position[:, 1:] = sides[:, :-1]
+
+    previous_position = np.zeros_like(position)
+    previous_position[:, 1:] = position[:, :-1]
+    turnover = np.abs(position - previous_position)
+    strategy_returns = position * bar_returns - cost * turnover
+
+    equity = np.cumprod(1 + strategy_returns, axis=1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+
+    # Trades are runs of a constant non-zero position; find every run start on
+    # the flattened panel, with each symbol's first bar forcing a new run
+    starts = position != previous_position
+    starts[:, 0] = True
+    start_index = np.flatnonzero(starts)
+    end_index = np.append(start_index[1:], position.size) - 1
+    row, start_col = np.divmod(start_index, n_bars)
+    end_col = end_index - row * n_bars
+    run_side = position.ravel()[start_index]
+    is_trade = run_side != 0
+
+    row, start_col, end_col, run_side = row[is_trade], start_col[is_trade], end_col[is_trade], run_side[is_trade]
+    equity_before = np.where(start_col > 0, equity[row, np.maximum(start_col - 1, 0)], 1.0)
+    trade_returns = equity[row, end_col] / equity_before - 1
+
+    trades = pd.DataFrame({
+        'Symbol': np.asarray(symbols, dtype=object)[row],
+        'Side': np.where(run_side > 0, 'Long', 'Short'),
+        'Entry': dates[start_col],
+        'Exit': dates[end_col],
+        'Bars': end_col - start_col + 1,
+        'Return (%)': trade_returns * 100,
+        'Open': end_col == n_bars - 1,
+    })
+
+    trade_count = np.bincount(row, minlength=n_symbols)
+    wins = np.bincount(row, weights=trade_returns > 0, minlength=n_symbols)
+    summary = pd.DataFrame({
+        'Total Return (%)': (equity[:, -1] - 1) * 100,
+        'Max Drawdown (%)': drawdown.min(axis=1) * 100,
+        'Trades': trade_count,
+        'Win Rate (%)': np.divide(wins * 100, trade_count, out=np.full(n_symbols, np.nan), where=trade_count > 0),
+        'Avg Trade (%)': np.divide(np.bincount(row, weights=trade_returns, minlength=n_symbols) * 100, trade_count,
+                                   out=np.full(n_symbols, np.nan), where=trade_count > 0),
+    }, index=pd.Index(symbols, name='Symbol'))
+
+    return {
+        'equity': pd.DataFrame(equity.T, index=dates, columns=symbols),
+        'drawdown': pd.DataFrame(drawdown.T, index=dates, columns=symbols),
+        'trades': trades,
+        'summary': summary,
+    }
+
+# Function to backtest the ATR trailing stop over a multi-ticker download in one call
+def calculate_panel_backtest(data, atr_period, multiplier, allow_short=True, cost=0.0):
+    stops = calculate_panel_trailing_stop(data, atr_period, multiplier)
+    close = data['Close'][stops['Long'].columns]
+    sides = sides_from_flags(stops['Long'].to_numpy().T, stops['Short'].to_numpy().T)
+    return backtest(close.to_numpy().T, sides, symbols=close.columns, dates=close.index,
+                    allow_short=allow_short, cost=cost)
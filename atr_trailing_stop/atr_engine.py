@@ -0,0 +1,93 @@
+import numpy as np
+from numba import njit
+
+# Function to calculate True Range for a whole series in one vectorized pass.
+# The first bar uses its own close as the previous close, and ties keep the
+# earlier candidate exactly like Python's built-in max().
+@njit(cache=True)
+def true_range(high, low, close):
+    previous_close = np.empty_like(close)
+    previous_close[0] = close[0]
+    previous_close[1:] = close[:-1]
+
+    high_low = high - low
+    high_close = np.abs(high - previous_close)
+    low_close = np.abs(low - previous_close)
+
+    tr = np.where(high_close > high_low, high_close, high_low)
+    tr = np.where(low_close > tr, low_close, tr)
+    return tr
+
+# Function to run the Wilder smoothing over a True Range array.
+# The first value is the average of the first `period` true ranges.
+@njit(cache=True)
+def wilder_atr(tr, period):
+    n = tr.size
+    atr = np.empty(n)
+
+    total = 0.0
+    for j in range(period):
+        total += tr[j]
+    previous_atr = total / period
+    atr[0] = previous_atr
+
+    for i in range(1, n):
+        previous_atr = (previous_atr * (period - 1) + tr[i]) / period
+        atr[i] = previous_atr
+
+    return atr
+
+# Function to calculate ATR from raw high/low/close arrays
+def atr(high, low, close, period):
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+
+    if high.size < period:
+        return np.full(high.size, np.nan)
+
+    return wilder_atr(true_range(high, low, close), period)
+
+# Function to run the long/short trailing stop ratchet over close and ATR arrays.
+# Returns the stop plus boolean flags marking the bars where the stop was
+# placed on the long side (below price) or the short side (above price).
+@njit(cache=True)
+def nb_trailing_stop(close, atr, multiplier):
+    n = close.size
+    stop = np.full(n, np.nan)
+    is_long = np.zeros(n, dtype=np.bool_)
+    is_short = np.zeros(n, dtype=np.bool_)
+
+    for i in range(1, n):
+        previous_stop = stop[i - 1]
+        offset = atr[i] * multiplier
+
+        if np.isnan(previous_stop):
+            stop[i] = close[i] - offset
+            is_long[i] = not np.isnan(stop[i])
+        elif close[i] > previous_stop:
+            candidate = close[i] - offset
+            if close[i - 1] > previous_stop and not candidate > previous_stop:
+                stop[i] = previous_stop
+            else:
+                stop[i] = candidate
+            is_long[i] = True
+        elif close[i] < previous_stop:
+            candidate = close[i] + offset
+            if close[i - 1] < previous_stop and not candidate < previous_stop:
+                stop[i] = previous_stop
+            else:
+                stop[i] = candidate
+            is_short[i] = True
+        else:
+            stop[i] = previous_stop
+            is_long[i] = is_long[i - 1]
+            is_short[i] = is_short[i - 1]
+
+    return stop, is_long, is_short
+
+# Function to calculate the trailing stop and side flags from raw close/ATR arrays
+def trailing_stop(close, atr, multiplier):
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    atr = np.ascontiguousarray(atr, dtype=np.float64)
+    return nb_trailing_stop(close, atr, float(multiplier))
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+from atr_engine import true_range, wilder_atr, nb_trailing_stop
+
+# Function to find the first and last bar where a symbol has a full high/low/close.
+# Bars outside this span are listing/delisting padding and stay NaN in the output.
+@njit(cache=True)
+def valid_span(high, low, close):
+    n = close.size
+    first = n
+    for i in range(n):
+        if not (np.isnan(high[i]) or np.isnan(low[i]) or np.isnan(close[i])):
+            first = i
+            break
+
+    last = first - 1
+    for i in range(n - 1, first - 1, -1):
+        if not (np.isnan(high[i]) or np.isnan(low[i]) or np.isnan(close[i])):
+            last = i
+            break
+
+    return first, last + 1
+
+# Function to calculate TR, ATR and the trailing stop for every symbol of a panel.
+# Inputs are 2-D arrays shaped (symbols, bars); each row is warmed up from its
+# own first valid bar, exactly as if the single-symbol engine were run on it.
+@njit(cache=True, parallel=True)
+def nb_panel_trailing_stop(high, low, close, period, multiplier):
+    n_symbols, n_bars = close.shape
+    tr = np.full((n_symbols, n_bars), np.nan)
+    atr = np.full((n_symbols, n_bars), np.nan)
+    stop = np.full((n_symbols, n_bars), np.nan)
+    is_long = np.zeros((n_symbols, n_bars), dtype=np.bool_)
+    is_short = np.zeros((n_symbols, n_bars), dtype=np.bool_)
+
+    for s in prange(n_symbols):
+        start, end = valid_span(high[s], low[s], close[s])
+        if end - start < period:
+            continue
+
+        h = np.ascontiguousarray(high[s, start:end])
+        l = np.ascontiguousarray(low[s, start:end])
+        c = np.ascontiguousarray(close[s, start:end])
+
+        symbol_tr = true_range(h, l, c)
+        symbol_atr = wilder_atr(symbol_tr, period)
+        symbol_stop, symbol_long, symbol_short = nb_trailing_stop(c, symbol_atr, multiplier)
+
+        tr[s, start:end] = symbol_tr
+        atr[s, start:end] = symbol_atr
+        stop[s, start:end] = symbol_stop
+        is_long[s, start:end] = symbol_long
+        is_short[s, start:end] = symbol_short
+
+    return tr, atr, stop, is_long, is_short
+
+# Function to calculate the trailing stop for raw (symbols, bars) arrays
+def panel_trailing_stop(high, low, close, period, multiplier):
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    return nb_panel_trailing_stop(high, low, close, int(period), float(multiplier))
+
+# Function to calculate the trailing stop for a multi-ticker download.
+# `data` is a frame with (field, ticker) columns as returned by
+# yf.download([...]); the result maps each output name to a dates x tickers frame.
+def calculate_panel_trailing_stop(data, atr_period, multiplier):
+    close = data['Close']
+    high = data['High'][close.columns]
+    low = data['Low'][close.columns]
+
+    # Frames are dates x tickers, the kernel wants tickers x bars
+    tr, atr, stop, is_long, is_short = panel_trailing_stop(
+        high.to_numpy().T, low.to_numpy().T, close.to_numpy().T, atr_period, multiplier)
+
+    outputs = {'TR': tr, 'ATR': atr, 'ATR_Trailing_Stop': stop, 'Long': is_long, 'Short': is_short}
+    return {name: pd.DataFrame(values.T, index=close.index, columns=close.columns)
+            for name, values in outputs.items()}
+
+# Function to calculate the trailing stop straight from a memory-mapped BarStore.
+# Without a symbol list the kernel reads the store's pages directly, no copy.
+def calculate_store_trailing_stop(store, atr_period, multiplier, symbols=None, start=None, end=None):
+    return panel_trailing_stop(store.panel('High', symbols, start, end),
+                               store.panel('Low', symbols, start, end),
+                               store.panel('Close', symbols, start, end),
+                               atr_period, multiplier)
@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+
+import atr_engine
+
+# Incremental ATR trailing stop.
+# Seed it once from history, then feed one bar at a time with update();
+# each update is O(1) and matches running the batch engine on the longer series.
+class TrailingStopState:
+    def __init__(self, period, multiplier, previous_close, previous_atr, previous_stop, side=0):
+        self.period = int(period)
+        self.multiplier = float(multiplier)
+        self.previous_close = float(previous_close)
+        self.previous_atr = float(previous_atr)
+        self.previous_stop = float(previous_stop)
+        self.side = int(side)  # 1 long, -1 short, 0 no stop yet
+
+    @classmethod
+    def from_history(cls, highs, lows, closes, period, multiplier):
+        """
+        Seed the state by running the batch engine over existing bars.
+
+        :param highs: Sequence of high prices
+        :param lows: Sequence of low prices
+        :param closes: Sequence of close prices
+        :param period: ATR period, history must hold at least this many bars
+        :param multiplier: ATR multiplier for the trailing stop
+        :return: TrailingStopState positioned after the last bar
+        """
+        # Positional access below; a Series with a DatetimeIndex has no label -1
+        highs, lows, closes = (np.asarray(values, dtype=np.float64) for values in (highs, lows, closes))
+        if len(closes) < period:
+            raise ValueError(f"At least {period} bars are needed to seed the ATR, got {len(closes)}.")
+
+        atr = atr_engine.atr(highs, lows, closes, period)
+        stop, is_long, is_short = atr_engine.trailing_stop(closes, atr, multiplier)
+        side = 1 if is_long[-1] else -1 if is_short[-1] else 0
+
+        return cls(period, multiplier, closes[-1], atr[-1], stop[-1], side)
+
+    def update(self, high, low, close):
+        """
+        Advance the state by one bar.
+
+        :return: The trailing stop for the new bar
+        """
+        tr = max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        atr = (self.previous_atr * (self.period - 1) + tr) / self.period
+        offset = atr * self.multiplier
+        previous_stop = self.previous_stop
+
+        if math.isnan(previous_stop):
+            stop = close - offset
+            self.side = 0 if math.isnan(stop) else 1
+        elif close > previous_stop:
+            candidate = close - offset
+            if self.previous_close > previous_stop and not candidate > previous_stop:
+                stop = previous_stop
+            else:
+                stop = candidate
+            self.side = 1
+        elif close < previous_stop:
+            candidate = close + offset
+            if self.previous_close < previous_stop and not candidate < previous_stop:
+                stop = previous_stop
+            else:
+                stop = candidate
+            self.side = -1
+        else:
+            stop = previous_stop
+
+        self.previous_close = float(close)
+        self.previous_atr = atr
+        self.previous_stop = stop
+        return stop
+
+    def to_dict(self):
+        return {
+            'period': self.period,
+            'multiplier': self.multiplier,
+            'previous_close': self.previous_close,
+            'previous_atr': self.previous_atr,
+            'previous_stop': self.previous_stop,
+            'side': self.side,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(**state)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+from atr_engine import true_range, wilder_atr, nb_trailing_stop
+
+# Function to evaluate a grid of ATR periods x multipliers over one series.
+# True Range is computed once and the ATR once per period; only the stop
+# ratchet runs per (period, multiplier). Outputs are (periods, multipliers, bars).
+@njit(cache=True, parallel=True)
+def nb_sweep(high, low, close, periods, multipliers):
+    n_bars = close.size
+    n_periods = periods.size
+    n_multipliers = multipliers.size
+
+    stops = np.full((n_periods, n_multipliers, n_bars), np.nan)
+    sides = np.zeros((n_periods, n_multipliers, n_bars), dtype=np.int8)
+
+    tr = true_range(high, low, close)
+
+    for p in prange(n_periods):
+        period = periods[p]
+        if n_bars < period:
+            continue
+
+        atr = wilder_atr(tr, period)
+        for m in range(n_multipliers):
+            stop, is_long, is_short = nb_trailing_stop(close, atr, multipliers[m])
+            stops[p, m] = stop
+            for i in range(n_bars):
+                if is_long[i]:
+                    sides[p, m, i] = 1
+                elif is_short[i]:
+                    sides[p, m, i] = -1
+
+    return stops, sides
+
+# Function to summarise each combination of a sweep.
+# The signal is traded on the next bar: long while the stop is below price,
+# short while it is above, flat before the stop exists.
+def sweep_summary(close, periods, multipliers, sides):
+    close = np.asarray(close, dtype=np.float64)
+    bar_returns = np.zeros_like(close)
+    bar_returns[1:] = close[1:] / close[:-1] - 1
+    bar_returns[np.isnan(bar_returns)] = 0.0
+
+    position = np.zeros(sides.shape)
+    position[..., 1:] = sides[..., :-1]
+    equity = np.cumprod(1 + position * bar_returns, axis=-1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=-1) - 1
+
+    flips = ((sides[..., 1:] != sides[..., :-1]) & (sides[..., :-1] != 0)).sum(axis=-1)
+    active = (sides != 0).sum(axis=-1)
+    pct_long = np.divide((sides == 1).sum(axis=-1) * 100.0, active,
+                         out=np.full(active.shape, np.nan), where=active > 0)
+
+    index = pd.MultiIndex.from_product([periods, multipliers], names=['ATR Period', 'Multiplier'])
+    return pd.DataFrame({
+        'Total Return (%)': (equity[..., -1] - 1).ravel() * 100,
+        'Max Drawdown (%)': drawdown.min(axis=-1).ravel() * 100,
+        'Flips': flips.ravel(),
+        'Long (%)': pct_long.ravel(),
+    }, index=index)
+
+# Function to sweep a grid of ATR periods and multipliers over one price history.
+# Returns the 3-D stop and side arrays (periods x multipliers x bars) plus a
+# summary frame indexed by (ATR Period, Multiplier).
+def sweep_trailing_stop(high, low, close, periods, multipliers):
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    periods = np.asarray(periods, dtype=np.int64)
+    multipliers = np.asarray(multipliers, dtype=np.float64)
+
+    stops, sides = nb_sweep(high, low, close, periods, multipliers)
+    summary = sweep_summary(close, periods, multipliers, sides)
+    return stops, sides, summary
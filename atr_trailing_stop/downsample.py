@@ -0,0 +1,54 @@
+import numpy as np
+from numba import njit
+
+# Largest-Triangle-Three-Buckets downsampling.
+# Keeps the first and last point and, for every bucket in between, the point
+# forming the largest triangle with the previously kept point and the average
+# of the next bucket, which preserves peaks and troughs of the series.
+@njit(cache=True)
+def nb_lttb(x, y, threshold):
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    every = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(avg_start, avg_end):
+            avg_x += x[j]
+            avg_y += y[j]
+        avg_x /= avg_end - avg_start
+        avg_y /= avg_end - avg_start
+
+        # Point of the current bucket with the largest triangle area
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > max_area:
+                max_area = area
+                next_a = j
+
+        indices[i + 1] = next_a
+        a = next_a
+
+    indices[threshold - 1] = n - 1
+    return indices
+
+# Function to downsample a pandas Series with a DatetimeIndex to at most `threshold` points.
+# NaN values are dropped first since they cannot be part of a drawn line.
+def lttb(series, threshold):
+    series = series.dropna()
+    x = series.index.asi8.astype(np.float64)
+    y = series.to_numpy(dtype=np.float64)
+    return series.iloc[nb_lttb(x, y, int(threshold))]
@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from atr_engine import atr as calculate_atr, trailing_stop
+from atr_sweep import nb_sweep
+
+# Price arrays attached from shared memory, one set per worker process
+WORKER_ARRAYS = {}
+
+# Function to lay out rolling in-sample/out-of-sample windows over `n_bars`.
+# Each window is (in-sample start, in-sample end = out-of-sample start, out-of-sample end);
+# windows advance by `step`, which defaults to the out-of-sample length.
+def walk_forward_windows(n_bars, in_sample, out_of_sample, step=None):
+    step = step or out_of_sample
+    windows = []
+    start = 0
+    while start + in_sample + out_of_sample <= n_bars:
+        windows.append((start, start + in_sample, start + in_sample + out_of_sample))
+        start += step
+    return windows
+
+# Function to score side signals on a close series from bar `start` onwards.
+# The side decided on a bar's close is held over the next bar.
+def score(close, sides, start, metric):
+    bar_returns = close[1:] / close[:-1] - 1
+    returns = sides[..., :-1] * bar_returns
+    returns = returns[..., max(start - 1, 0):]
+
+    if metric == 'total_return':
+        return np.prod(1 + returns, axis=-1) - 1
+    if metric == 'sharpe':
+        std = returns.std(axis=-1)
+        return np.divide(returns.mean(axis=-1) * np.sqrt(252), std, out=np.zeros(std.shape), where=std > 0)
+    raise ValueError(f"Unknown metric '{metric}', expected 'sharpe' or 'total_return'.")
+
+# Function run once per worker to map the parent's shared price arrays without copying
+def attach_shared_arrays(names, shape):
+    import numba
+
+    # One process per core already; numba's own threads would oversubscribe
+    numba.set_num_threads(1)
+    for field, name in names.items():
+        block = shared_memory.SharedMemory(name=name)
+        WORKER_ARRAYS[field] = (block, np.ndarray(shape, dtype=np.float64, buffer=block.buf))
+
+# Function run in a worker: optimise every symbol of a chunk on one window.
+# The grid is swept on the in-sample bars, the best combination is then run from
+# the in-sample start (so its ATR is warmed up) and scored on the out-of-sample bars.
+def evaluate_window(window, rows, periods, multipliers, metric):
+    high, low, close = (WORKER_ARRAYS[field][1] for field in ('High', 'Low', 'Close'))
+    is_start, is_end, oos_end = window
+    results = []
+
+    for row in rows:
+        h = np.ascontiguousarray(high[row, is_start:oos_end])
+        l = np.ascontiguousarray(low[row, is_start:oos_end])
+        c = np.ascontiguousarray(close[row, is_start:oos_end])
+        if np.isnan(h).any() or np.isnan(l).any() or np.isnan(c).any():
+            continue
+
+        n_in_sample = is_end - is_start
+        _, sides = nb_sweep(h[:n_in_sample], l[:n_in_sample], c[:n_in_sample], periods, multipliers)
+        in_sample_scores = score(c[:n_in_sample], sides, 0, metric)
+        best_p, best_m = np.unravel_index(np.nanargmax(in_sample_scores), in_sample_scores.shape)
+
+        atr = calculate_atr(h, l, c, periods[best_p])
+        _, is_long, is_short = trailing_stop(c, atr, multipliers[best_m])
+        oos_sides = is_long.astype(np.int8) - is_short.astype(np.int8)
+
+        results.append({
+            'row': row,
+            'window': window,
+            'ATR Period': int(periods[best_p]),
+            'Multiplier': float(multipliers[best_m]),
+            'In-Sample Score': float(in_sample_scores[best_p, best_m]),
+            'Out-of-Sample Score': float(score(c, oos_sides, n_in_sample, metric)),
+        })
+
+    return results
+
+# Function to run a walk-forward optimisation over a (symbols, bars) OHLC panel.
+# The panel is copied into shared memory once and every worker maps it; tasks are
+# (window, chunk of symbols) pairs spread over a process pool.
+def walk_forward(high, low, close, periods, multipliers, in_sample, out_of_sample, step=None,
+                 symbols=None, dates=None, metric='sharpe', workers=None, symbols_per_task=50):
+    """
+    :param high: (symbols, bars) array of highs, likewise low and close
+    :param periods: ATR periods to search
+    :param multipliers: Multipliers to search
+    :param in_sample: Bars per in-sample window
+    :param out_of_sample: Bars per out-of-sample window
+    :param step: Bars between window starts, defaults to out_of_sample
+    :param metric: 'sharpe' or 'total_return'
+    :param workers: Worker processes, defaults to all cores
+    :return: DataFrame with the chosen parameters and scores per symbol and window
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    n_symbols, n_bars = close.shape
+    symbols = list(range(n_symbols)) if symbols is None else list(symbols)
+    dates = np.arange(n_bars) if dates is None else np.asarray(dates)
+    periods = np.asarray(periods, dtype=np.int64)
+    multipliers = np.asarray(multipliers, dtype=np.float64)
+
+    windows = walk_forward_windows(n_bars, in_sample, out_of_sample, step)
+    chunks = [list(range(i, min(i + symbols_per_task, n_symbols))) for i in range(0, n_symbols, symbols_per_task)]
+
+    blocks = {}
+    try:
+        for field, values in (('High', high), ('Low', low), ('Close', close)):
+            block = shared_memory.SharedMemory(create=True, size=close.nbytes)
+            np.ndarray(close.shape, dtype=np.float64, buffer=block.buf)[:] = values
+            blocks[field] = block
+
+        # spawn, not fork: the parent may already be running numba threads
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=attach_shared_arrays,
+                                 initargs=({field: block.name for field, block in blocks.items()}, close.shape)) as pool:
+            futures = [pool.submit(evaluate_window, window, rows, periods, multipliers, metric)
+                       for window in windows for rows in chunks]
+            results = [result for future in futures for result in future.result()]
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    frame = pd.DataFrame([{
+        'Symbol': symbols[result['row']],
+        'In-Sample Start': dates[result['window'][0]],
+        'Out-of-Sample Start': dates[result['window'][1]],
+        'Out-of-Sample End': dates[result['window'][2] - 1],
+        **{key: value for key, value in result.items() if key not in ('row', 'window')},
+    } for result in results])
+    return frame
+
+# Function to run the walk-forward optimisation on a multi-ticker download
+def walk_forward_panel(data, periods, multipliers, in_sample, out_of_sample, **kwargs):
+    close = data['Close']
+    return walk_forward(data['High'][close.columns].to_numpy().T, data['Low'][close.columns].to_numpy().T,
+                        close.to_numpy().T, periods, multipliers, in_sample, out_of_sample,
+                        symbols=close.columns, dates=close.index, **kwargs)
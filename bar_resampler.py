@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# yfinance interval -> (pandas bucket rule, offset of the bucket grid).
+# Hourly and 90 minute bars are anchored on the 9:30 open, as Yahoo labels them;
+# weekly and monthly buckets are calendar periods starting Monday / the 1st.
+INTERVALS = {
+    '1m': ('1min', None), '2m': ('2min', None), '5m': ('5min', None), '15m': ('15min', None),
+    '30m': ('30min', None), '60m': ('60min', '30min'), '90m': ('90min', '30min'), '1h': ('60min', '30min'),
+    '1d': ('1D', None), '1wk': ('W-SUN', None), '1mo': ('M', None),
+}
+PERIOD_RULES = {'W-SUN', 'M'}
+
+# Function to label each bar with the start of the bucket it belongs to
+def bucket_labels(index, interval):
+    rule, offset = INTERVALS[interval]
+    if rule in PERIOD_RULES:
+        return index.to_period(rule).start_time
+    if offset is None:
+        return index.floor(rule)
+    offset = pd.Timedelta(offset)
+    return (index - offset).floor(rule) + offset
+
+# Function to aggregate sorted bars into `interval` buckets in one vectorized pass:
+# first open, highest high, lowest low, last close and adjusted close, summed volume
+def aggregate(frame, interval):
+    labels = bucket_labels(frame.index, interval)
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.append(starts[1:], len(frame)) - 1
+    values = frame.reindex(columns=FIELDS).to_numpy(dtype=np.float64)
+
+    return pd.DataFrame({
+        'Open': values[starts, 0],
+        'High': np.fmax.reduceat(values[:, 1], starts),
+        'Low': np.fmin.reduceat(values[:, 2], starts),
+        'Close': values[ends, 3],
+        'Adj Close': values[ends, 4],
+        'Volume': np.add.reduceat(np.nan_to_num(values[:, 5]), starts),
+    }, index=pd.DatetimeIndex(labels[starts], name=frame.index.name))
+
+# Incremental resampler from fine bars to a coarser interval.
+# Chunks are fed in time order; every bucket that can no longer change is returned
+# straight away, and only the still-open last bucket is carried between chunks,
+# so memory stays bounded by the chunk size whatever the length of the feed.
+class StreamingResampler:
+    def __init__(self, interval):
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval '{interval}', expected one of {', '.join(INTERVALS)}.")
+        self.interval = interval
+        self.pending = None
+
+    def update(self, chunk):
+        """
+        :param chunk: Frame of FIELDS columns with a sorted DatetimeIndex, later than earlier chunks
+        :return: Frame of the buckets completed by this chunk
+        """
+        chunk = chunk.reindex(columns=FIELDS).dropna(how='all')
+        if chunk.empty:
+            return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([], name=chunk.index.name))
+
+        # A bucket re-aggregates with its own label, so the open bucket is simply prepended
+        if self.pending is not None:
+            chunk = pd.concat([self.pending, chunk])
+        buckets = aggregate(chunk, self.interval)
+        self.pending = buckets.iloc[-1:]
+        return buckets.iloc[:-1]
+
+    def flush(self):
+        """
+        :return: Frame holding the last, possibly partial, bucket
+        """
+        pending = self.pending
+        self.pending = None
+        if pending is None:
+            return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([]))
+        return pending
+
+# Function to resample an iterable of bar chunks, yielding completed buckets as they close
+def resample_chunks(chunks, interval):
+    resampler = StreamingResampler(interval)
+    for chunk in chunks:
+        buckets = resampler.update(chunk)
+        if not buckets.empty:
+            yield buckets
+    buckets = resampler.flush()
+    if not buckets.empty:
+        yield buckets
+
+# Function to resample an in-memory frame, `chunk_size` bars at a time
+def resample(frame, interval, chunk_size=100000):
+    chunks = (frame.iloc[i:i + chunk_size] for i in range(0, len(frame), chunk_size))
+    buckets = list(resample_chunks(chunks, interval))
+    if not buckets:
+        return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([], name=frame.index.name))
+    return pd.concat(buckets)
+
+# Function to build `interval` bars for a symbol from a finer feed in the market data
+# cache. The source bars are fetched once and then streamed from SQLite in chunks,
+# so one stored 1 minute feed serves every coarser timeframe.
+def load_resampled(symbol, start, end=None, interval='1h', source_interval='1m', chunk_size=50000):
+    import market_data_cache
+
+    chunks = market_data_cache.iter_bars(symbol, start, end, interval=source_interval, chunk_size=chunk_size)
+    buckets = list(resample_chunks(chunks, interval))
+    if not buckets:
+        return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([], name='Date'))
+    return pd.concat(buckets)
@@ -0,0 +1,107 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# One fixed-width array per field, shaped (symbols, dates) so that a symbol's
+# history is a contiguous row that can be sliced without copying
+FILE_NAMES = {'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Adj Close': 'adj_close', 'Volume': 'volume'}
+
+# Function to write a (field, symbol) panel frame, as returned by a multi-ticker download
+def write_bar_store(path, data, dtype='float64'):
+    symbols = list(data['Close'].columns)
+    dates = data.index.values.astype('datetime64[ns]')
+    os.makedirs(path, exist_ok=True)
+
+    for field, name in FILE_NAMES.items():
+        if field not in data.columns.get_level_values(0):
+            continue
+        values = data[field].reindex(columns=symbols).to_numpy(dtype=dtype).T
+        np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(values))
+
+    np.save(os.path.join(path, 'dates.npy'), dates)
+    with open(os.path.join(path, 'symbols.json'), 'w') as f:
+        json.dump(symbols, f)
+
+# Function to build a store for a large universe without holding it all in memory.
+# Symbols are downloaded in chunks through the market data cache; the first pass
+# collects the shared date index, the second re-reads each chunk from the cache
+# and writes it straight into the memory-mapped arrays.
+def build_bar_store(path, symbols, start, end, dtype='float64', chunk_size=200):
+    import market_data_cache
+
+    symbols = list(symbols)
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+
+    dates = pd.DatetimeIndex([])
+    for chunk in chunks:
+        dates = dates.union(market_data_cache.download(chunk, start, end).index)
+
+    os.makedirs(path, exist_ok=True)
+    arrays = {field: np.lib.format.open_memmap(os.path.join(path, f'{name}.npy'), mode='w+',
+                                               dtype=dtype, shape=(len(symbols), len(dates)))
+              for field, name in FILE_NAMES.items()}
+
+    row = 0
+    for chunk in chunks:
+        data = market_data_cache.download(chunk, start, end).reindex(dates)
+        for field, array in arrays.items():
+            array[row:row + len(chunk)] = data[field].reindex(columns=chunk).to_numpy(dtype=dtype).T
+        row += len(chunk)
+
+    for array in arrays.values():
+        array.flush()
+    np.save(os.path.join(path, 'dates.npy'), dates.values.astype('datetime64[ns]'))
+    with open(os.path.join(path, 'symbols.json'), 'w') as f:
+        json.dump(symbols, f)
+
+# Read-only view over a bar store directory.
+# Arrays are opened with mmap_mode='r', so processes that open the same store
+# share the OS page cache and only touch the pages they slice.
+class BarStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'symbols.json')) as f:
+            self.symbols = json.load(f)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode='r')
+        self.fields = {field: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                       for field, name in FILE_NAMES.items()
+                       if os.path.exists(os.path.join(path, f'{name}.npy'))}
+
+    def date_slice(self, start=None, end=None):
+        """
+        :param start: First date to include, defaults to the start of the store
+        :param end: Date to stop before (exclusive), defaults to the end of the store
+        :return: slice over the date axis
+        """
+        first = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'))
+        last = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'))
+        return slice(int(first), int(last))
+
+    def series(self, field, symbol, start=None, end=None):
+        """
+        Zero-copy 1-D view of one symbol's field over a date range.
+        """
+        return self.fields[field][self.symbol_index[symbol], self.date_slice(start, end)]
+
+    def panel(self, field, symbols=None, start=None, end=None):
+        """
+        2-D (symbols, dates) array for a field. Without a symbol list this is a
+        zero-copy view; selecting symbols gathers their rows into a new array.
+        """
+        dates = self.date_slice(start, end)
+        if symbols is None:
+            return self.fields[field][:, dates]
+        rows = [self.symbol_index[symbol] for symbol in symbols]
+        return self.fields[field][rows, dates]
+
+    def frame(self, field, symbols=None, start=None, end=None):
+        """
+        Dates x symbols DataFrame for a field, laid out like yf.download(...)[field].
+        """
+        dates = self.date_slice(start, end)
+        values = self.panel(field, symbols, start, end)
+        return pd.DataFrame(values.T, index=pd.DatetimeIndex(self.dates[dates], name='Date'),
+                            columns=self.symbols if symbols is None else list(symbols))
@@ -3,7 +3,8 @@ import pandas as pd
 import json
 from datetime import datetime
 import uuid
-import yfinance as yf
+
+import symbol_metadata
 
 def create_basket(name, creation_date, creation_time):
     creation_datetime = datetime.combine(creation_date, creation_time)
@@ -18,9 +19,8 @@ def create_basket(name, creation_date, creation_time):
 
 def is_valid_symbol(symbol):
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        return 'symbol' in info and info['symbol'] == symbol
+        info_symbol = symbol_metadata.lookup(symbol)['info_symbol']
+        return info_symbol == symbol
     except:
         return False
 
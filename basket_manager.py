@@ -3,7 +3,7 @@ import pandas as pd
 import json
 from datetime import datetime
 import uuid
-import yfinance as yf
+import symbol_metadata
 
 # Initialize session state
 if 'baskets' not in st.session_state:
@@ -26,9 +26,8 @@ def create_basket(name, creation_date, creation_time):
 
 def is_valid_symbol(symbol):
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        return 'symbol' in info and info['symbol'] == symbol
+        info_symbol = symbol_metadata.lookup(symbol)['info_symbol']
+        return info_symbol == symbol
     except:
         return False
 
@@ -1,7 +1,9 @@
-import yfinance as yf
 import pandas as pd
 import streamlit as st
+import os
 from datetime import datetime, timedelta
+import market_data_cache
+from bar_store import BarStore
 
 # Helper function to get date range based on period selection
 def get_date_range(period, creation_date, performance_type):
@@ -29,7 +31,13 @@ def get_date_range(period, creation_date, performance_type):
 
 # Function to fetch stock data
 def get_stock_data(tickers, start_date, end_date):
-    data = yf.download(tickers, start=start_date, end=end_date)
+    # Prefer the shared memory-mapped store when one is configured and holds every ticker
+    if os.environ.get('BAR_STORE_DIR'):
+        store = BarStore(os.environ['BAR_STORE_DIR'])
+        if all(ticker in store.symbol_index for ticker in tickers):
+            return store.frame('Adj Close', tickers, start_date, end_date)
+
+    data = market_data_cache.download(tickers, start=start_date, end=end_date)
     return data['Adj Close']
 
 # Function to calculate overall daily performance of the basket
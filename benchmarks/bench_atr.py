@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# The benchmarked modules live in sibling folders of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'atr_trailing_stop'), os.path.join(ROOT, 'lambdas'), ROOT]
+
+import atr_engine
+import atr_panel
+import lambda_atr_trailing_stop
+import reference_atr
+
+# Function to generate a seeded synthetic OHLC panel shaped (symbols, bars).
+# Closes follow a geometric random walk with occasional overnight gaps; a small
+# share of bars is NaN and each symbol gets a random listing date (leading NaNs).
+def synthetic_ohlc(n_bars, n_symbols=1, seed=42, gap_probability=0.01, nan_probability=0.001):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.015, (n_symbols, n_bars))
+    gaps = rng.random((n_symbols, n_bars)) < gap_probability
+    returns[gaps] += rng.normal(0, 0.08, gaps.sum())
+
+    close = 100 * np.exp(np.cumsum(returns, axis=1))
+    spread = np.abs(rng.normal(0, 0.01, (2, n_symbols, n_bars)))
+    high = close * (1 + spread[0])
+    low = close * (1 - spread[1])
+
+    missing = rng.random((n_symbols, n_bars)) < nan_probability
+    listed = rng.integers(0, max(1, n_bars // 10), n_symbols)
+    missing |= np.arange(n_bars)[None, :] < listed[:, None]
+    for values in (high, low, close):
+        values[missing] = np.nan
+
+    return np.round(high, 2), np.round(low, 2), np.round(close, 2)
+
+def frame(high, low, close):
+    index = pd.bdate_range('1990-01-01', periods=close.size)
+    return pd.DataFrame({'High': high, 'Low': low, 'Close': close, 'Adj Close': close}, index=index)
+
+# One runner per implementation; each takes the (symbols, bars) panel and
+# produces the trailing stop for every symbol the way its callers do today.
+def run_reference(high, low, close, period, multiplier):
+    for s in range(close.shape[0]):
+        df = frame(high[s], low[s], close[s])
+        df['ATR'] = reference_atr.calculate_atr(df['High'], df['Low'], df['Close'], period)
+        reference_atr.calculate_trailing_stop(df, multiplier, period)
+
+def run_engine(high, low, close, period, multiplier):
+    for s in range(close.shape[0]):
+        atr = atr_engine.atr(high[s], low[s], close[s], period)
+        atr_engine.trailing_stop(close[s], atr, multiplier)
+
+def run_lambda(high, low, close, period, multiplier):
+    for s in range(close.shape[0]):
+        lambda_atr_trailing_stop.calculate_atr_trailing_stop(frame(high[s], low[s], close[s]), period)
+
+def run_panel(high, low, close, period, multiplier):
+    atr_panel.panel_trailing_stop(high, low, close, period, multiplier)
+
+IMPLEMENTATIONS = {
+    'reference': run_reference,
+    'engine': run_engine,
+    'lambda': run_lambda,
+    'panel': run_panel,
+}
+
+# Function to time one implementation: a warm-up call (JIT compilation), the
+# best of `repeat` timed runs, then one run under tracemalloc for peak memory.
+def measure(run, high, low, close, period, multiplier, repeat):
+    run(high[:1, :period + 1], low[:1, :period + 1], close[:1, :period + 1], period, multiplier)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(high, low, close, period, multiplier)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    run(high, low, close, period, multiplier)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timings)
+    return {
+        'seconds': seconds,
+        'bars_per_sec': close.size / seconds if seconds else None,
+        'peak_memory_mb': peak / 2 ** 20,
+    }
+
+# Function to check the compiled engines against the reference implementation
+def check_parity(high, low, close, period, multiplier):
+    panel_stop = atr_panel.panel_trailing_stop(high, low, close, period, multiplier)[2]
+    for s in range(close.shape[0]):
+        df = frame(high[s], low[s], close[s])
+        df['ATR'] = reference_atr.calculate_atr(df['High'], df['Low'], df['Close'], period)
+        expected = reference_atr.calculate_trailing_stop(df, multiplier, period).to_numpy()
+
+        atr = atr_engine.atr(high[s], low[s], close[s], period)
+        stop, _, _ = atr_engine.trailing_stop(close[s], atr, multiplier)
+        if not np.array_equal(stop, expected, equal_nan=True):
+            raise AssertionError(f"engine differs from reference for symbol {s}")
+
+        # The panel warms each symbol up from its first complete bar
+        valid = ~(np.isnan(high[s]) | np.isnan(low[s]) | np.isnan(close[s]))
+        if valid.all() and not np.array_equal(panel_stop[s], expected, equal_nan=True):
+            raise AssertionError(f"panel differs from reference for symbol {s}")
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ATR trailing stop implementations.")
+    parser.add_argument('--bars', default='1000,10000,100000', help="Comma separated bar counts")
+    parser.add_argument('--symbols', default='1,100', help="Comma separated symbol counts")
+    parser.add_argument('--implementations', default=','.join(IMPLEMENTATIONS), help="Comma separated implementation names")
+    parser.add_argument('--period', type=int, default=21)
+    parser.add_argument('--multiplier', type=float, default=3.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reference-max-bars', type=int, default=20000,
+                        help="Skip the per-bar reference above this many total bars, it runs for minutes")
+    parser.add_argument('--check', action='store_true', help="Verify the engines against the reference first")
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results',
+                                                         f"bench_atr_{datetime.now():%Y%m%d_%H%M%S}.json"))
+    args = parser.parse_args()
+
+    if args.check:
+        check_parity(*synthetic_ohlc(2000, 5, args.seed, nan_probability=0), args.period, args.multiplier)
+        print("Parity check passed.")
+
+    results = []
+    for n_symbols in [int(value) for value in args.symbols.split(',')]:
+        for n_bars in [int(value) for value in args.bars.split(',')]:
+            high, low, close = synthetic_ohlc(n_bars, n_symbols, args.seed)
+            for name in args.implementations.split(','):
+                if name == 'reference' and close.size > args.reference_max_bars:
+                    continue
+                result = measure(IMPLEMENTATIONS[name], high, low, close, args.period, args.multiplier, args.repeat)
+                result.update({'implementation': name, 'bars': n_bars, 'symbols': n_symbols})
+                results.append(result)
+                print(f"{name:>10} {n_symbols:>6} symbols x {n_bars:>8} bars: "
+                      f"{result['seconds']:.4f}s, {result['bars_per_sec']:,.0f} bars/s, "
+                      f"{result['peak_memory_mb']:.1f} MB peak")
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'parameters': {'period': args.period, 'multiplier': args.multiplier, 'repeat': args.repeat, 'seed': args.seed},
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
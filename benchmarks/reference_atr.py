@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# Original per-bar pandas implementation of the ATR app, kept as the baseline
+# the compiled engines are timed and checked against.
+
+# Function to calculate True Range
+def calculate_true_range(high, low, previous_close):
+    tr = max(high - low, abs(high - previous_close), abs(low - previous_close))
+    return tr
+
+# Function to calculate ATR using the exponential moving average (smoothing method shown in the formula)
+def calculate_atr(highs, lows, closes, period):
+    atr_values = []
+    previous_atr = 0
+
+    if len(highs) < period:
+        return [float('NaN')] * len(highs)
+
+    for i in range(len(highs)):
+        if i == 0:
+            true_ranges = [calculate_true_range(highs.iloc[j], lows.iloc[j], closes.iloc[j-1] if j > 0 else closes.iloc[0]) for j in range(min(period, len(highs)))]
+            previous_atr = sum(true_ranges) / period
+            atr_values.append(previous_atr)
+        else:
+            current_tr = calculate_true_range(highs.iloc[i], lows.iloc[i], closes.iloc[i-1])
+            current_atr = (previous_atr * (period - 1) + current_tr) / period
+            atr_values.append(current_atr)
+            previous_atr = current_atr
+
+    return pd.Series(atr_values, index=highs.index)
+
+# Function to calculate the trailing stop loss for both long and short positions
+def calculate_trailing_stop(df, multiplier, atr_period):
+    atr = df['ATR']
+    ts = atr * multiplier
+
+    atr_ts = pd.Series(np.nan, index=df.index)
+
+    for i in range(1, len(df)):
+        if df['Close'].iloc[i] > atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
+            if df['Close'].iloc[i-1] > atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
+                atr_ts.iloc[i] = max(atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else df['Close'].iloc[i] - ts.iloc[i], df['Close'].iloc[i] - ts.iloc[i])
+            else:
+                atr_ts.iloc[i] = df['Close'].iloc[i] - ts.iloc[i]
+        elif df['Close'].iloc[i] < atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
+            if df['Close'].iloc[i-1] < atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else 0:
+                atr_ts.iloc[i] = min(atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else df['Close'].iloc[i] + ts.iloc[i], df['Close'].iloc[i] + ts.iloc[i])
+            else:
+                atr_ts.iloc[i] = df['Close'].iloc[i] + ts.iloc[i]
+        else:
+            atr_ts.iloc[i] = atr_ts.iloc[i-1] if not np.isnan(atr_ts.iloc[i-1]) else df['Close'].iloc[i] - ts.iloc[i]
+
+    return atr_ts
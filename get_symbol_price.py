@@ -1,5 +1,6 @@
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
+import trading_calendar
+import trading_days
 
 def is_weekend(date_str):
     """
@@ -13,20 +14,16 @@ def is_weekend(date_str):
 
 def is_market_open(date_str):
     """
-    Check if the market was open on a given date by using a continuously traded symbol like 'SPY'.
+    Check if the market was open on a given date using the trading calendar, which is
+    built once from the cached history of a continuously traded symbol like 'SPY'.
     
     :param date_str: Date in the format 'YYYY-MM-DD'
-    :return: True if the market was open, False otherwise
+    :return: True if the market was open, False otherwise (also for dates outside the calendar's range)
     """
-    # Define a broader date range (including a buffer day before and after the target date)
-    start_date = (datetime.strptime(date_str, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
-    end_date = (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
-
-    # Use 'SPY' (S&P 500 ETF) to check if the market was open
-    market_data = yf.download('SPY', start=start_date, end=end_date)
-
-    # Check if the specific date exists in the data (indicating that the market was open)
-    return date_str in market_data.index.strftime('%Y-%m-%d')
+    try:
+        return trading_calendar.get_calendar().is_session(date_str)
+    except ValueError:
+        return False
 
 def is_trading_day_for_symbol(symbol, date_str):
     """
@@ -36,25 +33,19 @@ def is_trading_day_for_symbol(symbol, date_str):
     :param date_str: Date in the format 'YYYY-MM-DD'
     :return: True if the market was open and the symbol was traded on that day, False otherwise
     """
-    # Check if the date falls on a weekend
-    if is_weekend(date_str):
+    # Weekends and holidays come from the trading calendar, the symbol's bars from the cache
+    reason = trading_days.verify_trading_days([(symbol, date_str)])['Reason'].iloc[0]
+
+    if reason == 'weekend':
         print(f"{date_str} is a weekend. Markets are closed.")
         return False
 
-    # Check if the market was open using 'SPY' as the reference symbol
-    if not is_market_open(date_str):
+    if reason == 'holiday':
         print(f"{date_str} is a holiday or non-trading day. No market data available.")
         return False
 
-    # Check if the symbol existed and was traded on that day
-    start_date = (datetime.strptime(date_str, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
-    end_date = (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
-    
-    # Download data for the specific symbol
-    stock_data = yf.download(symbol, start=start_date, end=end_date)
-
     # Check if the symbol was traded on the specific date
-    if stock_data.empty or date_str not in stock_data.index.strftime('%Y-%m-%d'):
+    if reason != 'traded':
         print(f"{symbol} was not traded on {date_str}. The symbol might not have existed then.")
         return False
 
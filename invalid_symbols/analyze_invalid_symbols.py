@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import json
-from datetime import datetime
-from business_logic import check_symbol_exists
+import time
+from functools import partial
+from business_logic import activity_scan, symbol_status
+from upload_parser import UploadParser, batches
+from validation_pipeline import TokenBucket, validate_symbols
 
 # Set the page title
 st.set_page_config(page_title="Invalid Symbol Analyzer")
@@ -49,69 +52,96 @@ We use the following financial and data conditions to determine whether a symbol
 5. **Link to Yahoo Finance**: Regardless of whether the symbol is valid or traded, we provide a link to Yahoo Finance for further investigation.
 """)
 
+# Sidebar for the validation request limits
+st.sidebar.title("Validation Settings")
+workers = st.sidebar.number_input("Concurrent Requests", min_value=1, max_value=32, value=8)
+rate = st.sidebar.number_input("Requests per Second", min_value=0.5, max_value=50.0, value=5.0, step=0.5)
+retries = st.sidebar.number_input("Retries per Symbol", min_value=0, max_value=10, value=3)
+batch_history = st.sidebar.checkbox("Batch recent-activity download", value=True,
+                                    help="Fetch the 5-day history of all symbols in multi-ticker requests")
+
 # Create file uploader
 uploaded_file = st.file_uploader("Upload a text file", type="txt")
 
-def extract_date(content):
-    try:
-        date_str = content.split(' at ')[1].split(' GMT')[0]
-        date_obj = datetime.strptime(date_str, '%a %b %d %Y %H:%M:%S')
-        return date_obj.strftime('%Y-%m-%d')
-    except Exception:
-        return datetime.now().strftime('%Y-%m-%d')
+# Upload records validated per batch
+BATCH_SIZE = 500
 
-if uploaded_file is not None:
-    content = uploaded_file.read().decode("utf-8")
-    date_to_check = extract_date(content)
-    start_index = content.find('[')
-    json_data = content[start_index:].strip()
+# Most recent rows shown while validating; the full table is drawn once at the end
+LIVE_ROWS = 200
+
+RESULT_COLUMNS = ['Company Name', 'Asset Type', 'Last Traded Date', 'Last Volume', 'Last Close', 'Yahoo Finance Link']
 
+# Function to report a symbol whose lookups kept failing, as check_symbol_exists does
+def invalid_result(symbol, error):
+    return None, None, 'N/A', 'N/A', 'N/A', "Invalid"
+
+# Function to turn a validation result into the table columns
+def result_row(symbol, result):
+    company_name, asset_type, last_traded_date, last_volume, last_close, _ = result
+    yahoo_link = f'<a href="https://finance.yahoo.com/quote/{symbol}" target="_blank">Yahoo Finance</a>'
+    return [
+        company_name if company_name else "N/A",
+        asset_type if asset_type else "N/A",
+        last_traded_date if last_traded_date else "N/A",
+        last_volume if last_volume else "N/A",
+        last_close if last_close else "N/A",
+        yahoo_link,
+    ]
+
+if uploaded_file is not None:
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    table = st.empty()
+    bucket = TokenBucket(rate)
+    rows = []
+    last_render = 0.0
+
+    # Download progress of the current batch's recent history, chunk by chunk
+    def show_download_progress(done, total):
+        status_text.text(f"Downloading recent history: {done} of {total} symbols in this batch "
+                         f"({len(rows)} validated so far)")
+
+    # Records are parsed from the upload as it is read and validated a batch at a time,
+    # so neither the file nor its parsed JSON is ever held in memory as a whole.
+    # The result rows still grow with the upload, since the final table shows them all.
     try:
-        symbols_data = json.loads(json_data)
-        df = pd.DataFrame(symbols_data)
-        df['id'] = df['id'].astype(str)
-
-        company_names = []
-        asset_types = []
-        last_traded_dates = []
-        last_volumes = []
-        last_closes = []
-        yahoo_links = []
-
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        total_symbols = len(df)
-        for idx, symbol in enumerate(df['symbol']):
-            progress = (idx + 1) / total_symbols
-            progress_bar.progress(progress)
-            status_text.text(f"Validating symbol {idx + 1} of {total_symbols}: {symbol}")
-
-            # Call the business logic to validate the symbol
-            company_name, asset_type, last_traded_date, last_volume, last_close, _ = check_symbol_exists(symbol)
-
-            yahoo_link = f'<a href="https://finance.yahoo.com/quote/{symbol}" target="_blank">Yahoo Finance</a>'
-            yahoo_links.append(yahoo_link)
-
-            company_names.append(company_name if company_name else "N/A")
-            asset_types.append(asset_type if asset_type else "N/A")
-            last_traded_dates.append(last_traded_date if last_traded_date else "N/A")
-            last_volumes.append(last_volume if last_volume else "N/A")
-            last_closes.append(last_close if last_close else "N/A")
-
-        df['Company Name'] = company_names
-        df['Asset Type'] = asset_types
-        df['Last Traded Date'] = last_traded_dates
-        df['Last Volume'] = last_volumes
-        df['Last Close'] = last_closes
-        df['Yahoo Finance Link'] = yahoo_links
-
-        progress_bar.empty()
-        status_text.empty()
-
-        st.markdown(df.to_html(escape=False, index=False), unsafe_allow_html=True)
-
-    except json.JSONDecodeError as e:
+        parser = UploadParser(uploaded_file)
+        date_to_check = parser.date
+        total_bytes = max(uploaded_file.size, 1)
+
+        for batch in batches(parser, BATCH_SIZE):
+            symbols = [record['symbol'] for record in batch]
+
+            # Recent history for the batch first, a few symbols per request
+            check = symbol_status
+            if batch_history:
+                activity = activity_scan(symbols, on_chunk=show_download_progress)
+                check = partial(symbol_status, activity=activity)
+
+            # Symbols are validated concurrently; rows are filled in as results arrive
+            batch_rows = [None] * len(batch)
+            for completed, (idx, result) in enumerate(validate_symbols(symbols, check, on_error=invalid_result,
+                                                                       workers=workers, retries=retries,
+                                                                       bucket=bucket), 1):
+                record = dict(batch[idx], id=str(batch[idx].get('id')))
+                batch_rows[idx] = {**record, **dict(zip(RESULT_COLUMNS, result_row(symbols[idx], result)))}
+                progress_bar.progress(min(parser.bytes_read / total_bytes, 1.0))
+                status_text.text(f"Validated {len(rows) + completed} symbols: {symbols[idx]}")
+
+                # Redraw the most recent rows at most once a second
+                if time.monotonic() - last_render >= 1.0:
+                    recent = [row for row in batch_rows if row is not None][-LIVE_ROWS:]
+                    recent = rows[max(len(rows) - LIVE_ROWS + len(recent), 0):] + recent
+                    table.markdown(pd.DataFrame(recent).to_html(escape=False, index=False), unsafe_allow_html=True)
+                    last_render = time.monotonic()
+            rows += batch_rows
+
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         st.error(f"Error parsing the JSON data: {e}")
+
+    progress_bar.empty()
+    status_text.empty()
+    if rows:
+        table.markdown(pd.DataFrame(rows).to_html(escape=False, index=False), unsafe_allow_html=True)
 else:
     st.write("Please upload a valid text file with the symbols data.")
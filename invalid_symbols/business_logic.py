@@ -1,52 +1,115 @@
+import numpy as np
+import pandas as pd
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
+
+import symbol_metadata
+import trading_calendar
+import trading_days
 
 def is_weekend(date_str):
     date_obj = datetime.strptime(date_str, '%Y-%m-%d')
     return date_obj.weekday() >= 5
 
+# Dates outside the calendar's range count as closed, as they did before the calendar
 def is_market_open(date_str):
-    start_date = (datetime.strptime(date_str, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
-    end_date = (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
-    market_data = yf.download('SPY', start=start_date, end=end_date, progress=False)
-    return date_str in market_data.index.strftime('%Y-%m-%d')
+    try:
+        return trading_calendar.get_calendar().is_session(date_str)
+    except ValueError:
+        return False
 
 def is_trading_day_for_symbol(symbol, date_str):
-    if is_weekend(date_str):
-        return False
-    if not is_market_open(date_str):
-        return False
-    start_date = (datetime.strptime(date_str, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
-    end_date = (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
-    stock_data = yf.download(symbol, start=start_date, end=end_date, progress=False)
-    return not stock_data.empty and date_str in stock_data.index.strftime('%Y-%m-%d')
+    return bool(trading_days.verify_trading_days([(symbol, date_str)])['Trading Day'].iloc[0])
+
+# Function to compute the check_symbol_exists activity fields for a whole panel at once.
+# `close` and `volume` are (dates, symbols) frames; a symbol's last traded day is its
+# last row with a close, and an unchanged close over the window counts as not traded.
+def recent_activity(close, volume, today=None):
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    if len(close) == 0:
+        return pd.DataFrame({'Last Traded Date': 'N/A', 'Last Volume': np.nan, 'Last Close': np.nan,
+                             'Status': "Valid but Not Traded"}, index=close.columns)
+
+    has_close = close.notna().to_numpy()
+    traded = has_close.any(axis=0)
+    last = len(close) - 1 - np.argmax(has_close[::-1], axis=0)
+    columns = np.arange(close.shape[1])
+
+    last_traded_date = np.where(traded, close.index.strftime('%Y-%m-%d').to_numpy()[last], 'N/A')
+    last_close = np.where(traded, close.to_numpy()[last, columns], np.nan)
+    last_volume = np.where(traded, volume.to_numpy()[last, columns], np.nan)
+    unchanged = (close.max() == close.min()).to_numpy()
+
+    status = np.select(
+        [~traded, (last_traded_date == today) & (last_volume > 0), last_volume == 0, unchanged],
+        ["Valid but Not Traded", "Valid and Traded", "Valid but Not Traded", "Valid but Not Traded"],
+        "Valid")
+    return pd.DataFrame({
+        'Last Traded Date': last_traded_date,
+        'Last Volume': last_volume,
+        'Last Close': last_close,
+        'Status': status,
+    }, index=close.columns)
+
+def activity_scan(symbols, period='5d', chunk_size=200, on_chunk=None):
+    """
+    Download recent history for many symbols in chunked multi-ticker requests and
+    derive each symbol's activity fields with recent_activity.
+
+    :param on_chunk: Optional function of (symbols done, total) called after each chunk
+    :return: Frame indexed by symbol with Last Traded Date, Last Volume, Last Close and Status
+    """
+    symbols = list(dict.fromkeys(symbols))
+    frames = []
+    for i in range(0, len(symbols), chunk_size):
+        chunk = symbols[i:i + chunk_size]
+        data = yf.download(chunk, period=period, auto_adjust=True, progress=False)
+        if data.empty:
+            close = volume = pd.DataFrame(columns=chunk, index=pd.DatetimeIndex([]), dtype=float)
+        else:
+            close, volume = data['Close'].reindex(columns=chunk), data['Volume'].reindex(columns=chunk)
+        frames.append(recent_activity(close, volume))
+        if on_chunk:
+            on_chunk(min(i + chunk_size, len(symbols)), len(symbols))
+    return pd.concat(frames) if frames else recent_activity(pd.DataFrame(), pd.DataFrame())
+
+# Lookup behind check_symbol_exists; network errors propagate so callers can retry them.
+# With `activity` from activity_scan the per-symbol history request is skipped.
+def symbol_status(symbol, activity=None):
+    # Name and type come from the local metadata store, refreshed from Ticker.info after its TTL
+    metadata = symbol_metadata.lookup(symbol)
+    company_name = metadata['short_name']
+    asset_type = metadata['quote_type']
+
+    if not company_name or not asset_type:
+        return company_name, asset_type, 'N/A', 'N/A', 'N/A', "Invalid"
+
+    if activity is not None and symbol in activity.index:
+        row = activity.loc[symbol]
+        if row['Last Traded Date'] == 'N/A':
+            return company_name, asset_type, 'N/A', 'N/A', 'N/A', row['Status']
+        volume = int(row['Last Volume']) if not np.isnan(row['Last Volume']) else row['Last Volume']
+        return company_name, asset_type, row['Last Traded Date'], volume, row['Last Close'], row['Status']
+
+    hist = yf.Ticker(symbol).history(period='5d')
+    if hist.empty:
+        return company_name, asset_type, 'N/A', 'N/A', 'N/A', "Valid but Not Traded"
+
+    last_traded_date = hist.index.max().strftime('%Y-%m-%d')
+    last_volume = hist['Volume'].iloc[-1]
+    last_close = hist['Close'].iloc[-1]
+
+    if last_traded_date == datetime.now().strftime('%Y-%m-%d') and last_volume > 0:
+        return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid and Traded"
+    elif last_volume == 0:
+        return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid but Not Traded"
+    elif last_close == hist['Close'].max() and hist['Close'].nunique() == 1:
+        return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid but Not Traded"
+    else:
+        return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid"
 
 def check_symbol_exists(symbol):
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        
-        company_name = info.get('shortName', None)
-        asset_type = info.get('quoteType', None)
-        
-        if not company_name or not asset_type:
-            return company_name, asset_type, 'N/A', 'N/A', 'N/A', "Invalid"
-        
-        hist = stock.history(period='5d')
-        if hist.empty:
-            return company_name, asset_type, 'N/A', 'N/A', 'N/A', "Valid but Not Traded"
-
-        last_traded_date = hist.index.max().strftime('%Y-%m-%d')
-        last_volume = hist['Volume'].iloc[-1]
-        last_close = hist['Close'].iloc[-1]
-
-        if last_traded_date == datetime.now().strftime('%Y-%m-%d') and last_volume > 0:
-            return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid and Traded"
-        elif last_volume == 0:
-            return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid but Not Traded"
-        elif last_close == hist['Close'].max() and hist['Close'].nunique() == 1:
-            return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid but Not Traded"
-        else:
-            return company_name, asset_type, last_traded_date, last_volume, last_close, "Valid"
+        return symbol_status(symbol)
     except Exception:
         return None, None, 'N/A', 'N/A', 'N/A', "Invalid"
@@ -0,0 +1,89 @@
+import codecs
+import json
+from datetime import datetime
+
+# Function to read the export date from the header line, falling back to today
+def extract_date(content):
+    try:
+        date_str = content.split(' at ')[1].split(' GMT')[0]
+        date_obj = datetime.strptime(date_str, '%a %b %d %Y %H:%M:%S')
+        return date_obj.strftime('%Y-%m-%d')
+    except Exception:
+        return datetime.now().strftime('%Y-%m-%d')
+
+# Incremental reader for symbol export files: a free-text header followed by a
+# JSON array of records. The stream is decoded chunk by chunk and each array
+# element is parsed with raw_decode as soon as it is complete, so only the
+# current chunk and one partial record are held in memory.
+class UploadParser:
+    def __init__(self, stream, chunk_size=65536, encoding='utf-8'):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.bytes_read = 0
+        self.header = self.read_header()
+        self.date = extract_date(self.header)
+
+    # Function to append the next chunk, dropping the part of the buffer already parsed
+    def read_chunk(self):
+        data = self.stream.read(self.chunk_size)
+        self.bytes_read += len(data)
+        self.eof = not data
+        self.buffer = self.buffer[self.position:] + self.decoder.decode(data, final=self.eof)
+        self.position = 0
+        return not self.eof
+
+    # Function to consume everything before the opening '[' of the array
+    def read_header(self):
+        header = ''
+        while '[' not in self.buffer:
+            header += self.buffer
+            self.buffer = ''
+            if not self.read_chunk():
+                raise json.JSONDecodeError("No JSON array found in the upload", header, len(header))
+        self.position = self.buffer.index('[') + 1
+        return header + self.buffer[:self.position - 1]
+
+    def __iter__(self):
+        """
+        :return: Generator of the array's records, in file order
+        """
+        while True:
+            # Skip separators, reading more when the buffer runs out
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n,':
+                self.position += 1
+            if self.position == len(self.buffer):
+                if not self.read_chunk():
+                    raise json.JSONDecodeError("Unterminated JSON array", self.buffer, self.position)
+                continue
+            if self.buffer[self.position] == ']':
+                return
+
+            try:
+                record, end = self.json_decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.read_chunk():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof:
+                self.read_chunk()
+                continue
+
+            self.position = end
+            yield record
+
+# Function to group an iterable into lists of up to `size` items
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,73 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Token bucket shared by all worker threads: tokens refill at `rate` per second
+# up to `capacity`, and every request takes one, sleeping until one is available
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# Function to call `check` for one symbol, retrying failures with exponential backoff and jitter.
+# Every attempt, retries included, waits for a token first.
+def call_with_retries(check, symbol, bucket, retries, backoff):
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            return check(symbol)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt * (1 + random.random()))
+
+def validate_symbols(symbols, check, on_error=None, workers=8, rate=5.0, burst=None, retries=3, backoff=1.0,
+                     bucket=None):
+    """
+    Validate symbols concurrently, yielding each result as soon as it completes.
+
+    :param symbols: Symbols to validate
+    :param check: Function of a symbol returning its result; exceptions are retried
+    :param on_error: Function of (symbol, exception) giving the result once retries run out,
+        by default the exception is raised
+    :param workers: Maximum number of requests in flight
+    :param rate: Requests per second across all workers
+    :param burst: Requests allowed at once after an idle spell, defaults to `rate`
+    :param retries: Retries per symbol after the first attempt
+    :param backoff: Seconds before the first retry, doubling on each further retry
+    :param bucket: TokenBucket to share the rate limit across several calls
+    :return: Generator of (position in symbols, result) in completion order
+    """
+    bucket = bucket or TokenBucket(rate, burst)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(call_with_retries, check, symbol, bucket, retries, backoff): (i, symbol)
+                   for i, symbol in enumerate(symbols)}
+        try:
+            for future in as_completed(futures):
+                i, symbol = futures[future]
+                try:
+                    yield i, future.result()
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    yield i, on_error(symbol, e)
+        finally:
+            # Stop queued work if the consumer goes away early (e.g. a Streamlit rerun)
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,137 @@
+from numpy import empty, nan, signbit, uintc, zeros, zeros_like
+from numba import njit
+
+@njit(cache=True)
+def nb_atrts(x, ma, atr_, length, ma_length):
+    m = x.size
+    k = max(length, ma_length)
+
+    result = x.copy()
+    up = zeros_like(x, dtype=uintc)
+    dn = zeros_like(x, dtype=uintc)
+
+    expn = x > ma
+    up[expn], dn[~expn] = 1, 1
+    up[:k], dn[:k] = 0, 0
+    result[:k] = nan
+
+    for i in range(k, m):
+        pr = result[i - 1]
+        if up[i]:
+            result[i] = x[i] - atr_[i]
+            if result[i] < pr:
+                result[i] = pr
+        if dn[i]:
+            result[i] = x[i] + atr_[i]
+            if result[i] > pr:
+                result[i] = pr
+
+    long, short = result * up, result * dn
+    long[long == 0], short[short == 0] = nan, nan
+
+    return result, long, short
+
+# Rolling mean state, updated the same way pandas' rolling().mean() does it
+# (Kahan-compensated add/remove), so the fused kernel reproduces its output:
+# [sum, add compensation, remove compensation, observations, negatives,
+#  consecutive equal values, previous value]
+@njit(cache=True)
+def rolling_add(state, value):
+    if value == value:
+        state[3] += 1
+        y = value - state[1]
+        t = state[0] + y
+        state[1] = t - state[0] - y
+        state[0] = t
+        if signbit(value):
+            state[4] += 1
+        if value == state[6]:
+            state[5] += 1
+        else:
+            state[5] = 1
+        state[6] = value
+
+@njit(cache=True)
+def rolling_remove(state, value):
+    if value == value:
+        state[3] -= 1
+        y = -value - state[2]
+        t = state[0] + y
+        state[2] = t - state[0] - y
+        state[0] = t
+        if signbit(value):
+            state[4] -= 1
+
+@njit(cache=True)
+def rolling_mean(state, window):
+    nobs = state[3]
+    if nobs < window or nobs == 0:
+        return nan
+    if state[5] >= nobs:
+        return state[6]
+    result = state[0] / nobs
+    if state[4] == 0 and result < 0:
+        return 0.0
+    if state[4] == nobs and result > 0:
+        return 0.0
+    return result
+
+# Fused ATR trailing stop: True Range, the rolling ATR and MA, the stop ratchet
+# and the long/short split in one pass over high/low/close with preallocated
+# outputs. Matches the pandas rolling path followed by nb_atrts.
+@njit(cache=True)
+def nb_atrts_fused(high, low, close, length, ma_length):
+    m = close.size
+    k = max(length, ma_length)
+
+    atr_ = empty(m)
+    ma = empty(m)
+    result = empty(m)
+    long = empty(m)
+    short = empty(m)
+
+    # True Range values still inside the ATR window
+    window_tr = empty(length)
+    atr_state = zeros(7)
+    ma_state = zeros(7)
+
+    for i in range(m):
+        # True Range, skipping NaN candidates like DataFrame.max(axis=1)
+        tr = high[i] - low[i]
+        if i > 0:
+            for candidate in (abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])):
+                if candidate == candidate and (tr != tr or candidate > tr):
+                    tr = candidate
+
+        if i == 0:
+            atr_state[6] = tr
+            ma_state[6] = close[0]
+        if i >= length:
+            rolling_remove(atr_state, window_tr[i % length])
+        if i >= ma_length:
+            rolling_remove(ma_state, close[i - ma_length])
+        window_tr[i % length] = tr
+        rolling_add(atr_state, tr)
+        rolling_add(ma_state, close[i])
+        atr_[i] = rolling_mean(atr_state, length)
+        ma[i] = rolling_mean(ma_state, ma_length)
+
+        if i < k:
+            result[i], long[i], short[i] = nan, nan, nan
+            continue
+
+        pr = result[i - 1]
+        if close[i] > ma[i]:
+            result[i] = close[i] - atr_[i]
+            if result[i] < pr:
+                result[i] = pr
+            long[i] = result[i] if result[i] != 0 else nan
+            short[i] = nan
+        else:
+            result[i] = close[i] + atr_[i]
+            if result[i] > pr:
+                result[i] = pr
+            short[i] = result[i] if result[i] != 0 else nan
+            long[i] = nan
+
+    return atr_, ma, result, long, short
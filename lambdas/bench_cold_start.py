@@ -0,0 +1,65 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+LAMBDA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Code run in a fresh interpreter per sample: module init, then the first
+# computation on synthetic bars (no network), which triggers the lazy imports
+# and either loads the kernel from the cache or compiles it.
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import lambda_atr_trailing_stop as handler
+initialized = time.perf_counter()
+
+import numpy as np
+import pandas as pd
+close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 2000))
+data = pd.DataFrame({'High': close + 1, 'Low': close - 1, 'Adj Close': close},
+                    index=pd.bdate_range('2000-01-01', periods=close.size))
+handler.calculate_atr_trailing_stop(data, 21)
+finished = time.perf_counter()
+
+print(json.dumps({'init': initialized - started, 'first_call': finished - initialized, 'total': finished - started}))
+'''
+
+def sample(numba_cache_dir):
+    env = dict(os.environ, NUMBA_CACHE_DIR=numba_cache_dir)
+    output = subprocess.check_output([sys.executable, '-c', PROBE, LAMBDA_DIR], env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(samples):
+    return {phase: statistics.median(s[phase] for s in samples) for phase in samples[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ATR Lambda cold-start latency with and without the shipped kernel cache.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    shipped = os.path.join(LAMBDA_DIR, 'numba_cache')
+    if not os.path.isdir(shipped):
+        subprocess.check_call([sys.executable, os.path.join(LAMBDA_DIR, 'build_numba_cache.py')])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as empty:
+        # Each JIT sample gets its own empty cache so nothing is reused between runs
+        results['jit'] = summarize([sample(tempfile.mkdtemp(dir=empty)) for _ in range(args.runs)])
+    results['cached'] = summarize([sample(shipped) for _ in range(args.runs)])
+
+    for mode, timings in results.items():
+        print(f"{mode:>7}: init {timings['init']:.3f}s, first call {timings['first_call']:.3f}s, "
+              f"total {timings['total']:.3f}s (median of {args.runs})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+
+LAMBDA_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(LAMBDA_DIR, 'numba_cache')
+
+# Populate lambdas/numba_cache with the compiled kernels so the Lambda loads them
+# from disk instead of compiling on every cold start.
+#
+# Numba keys its cache on the absolute path and modification time of the source
+# file, the Python/numba versions and the CPU. Run this inside the Lambda runtime
+# image, from the directory the function is deployed to (e.g. /var/task), and
+# ship numba_cache/ next to atr_kernels.py without touching the sources after.
+def build():
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    os.environ['NUMBA_CACHE_DIR'] = CACHE_DIR
+    sys.path.insert(0, LAMBDA_DIR)
+
+    import atr_kernels
+
+    # Compile for the argument types the handler passes in
+    x = np.linspace(100.0, 110.0, 64)
+    atr_kernels.nb_atrts(x, x, np.ones_like(x), 21, 21)
+    atr_kernels.nb_atrts_fused(x + 1, x - 1, x, 21, 21)
+
+    for name in dir(atr_kernels):
+        kernel = getattr(atr_kernels, name)
+        if hasattr(kernel, 'signatures'):
+            print(f"{name}: {len(kernel.signatures)} signature(s) cached")
+    print(f"Kernel cache written to {CACHE_DIR}")
+
+if __name__ == "__main__":
+    build()
@@ -1,72 +1,221 @@
 import json
-import pandas as pd
-import yfinance as yf
-from numpy import nan, uintc, zeros_like
-from numba import njit
-
-@njit(cache=True)
-def nb_atrts(x, ma, atr_, length, ma_length):
-    m = x.size
-    k = max(length, ma_length)
-
-    result = x.copy()
-    up = zeros_like(x, dtype=uintc)
-    dn = zeros_like(x, dtype=uintc)
-
-    expn = x > ma
-    up[expn], dn[~expn] = 1, 1
-    up[:k], dn[:k] = 0, 0
-    result[:k] = nan
-
-    for i in range(k, m):
-        pr = result[i - 1]
-        if up[i]:
-            result[i] = x[i] - atr_[i]
-            if result[i] < pr:
-                result[i] = pr
-        if dn[i]:
-            result[i] = x[i] + atr_[i]
-            if result[i] > pr:
-                result[i] = pr
-
-    long, short = result * up, result * dn
-    long[long == 0], short[short == 0] = nan, nan
-
-    return result, long, short
-
-def load_data(ticker, start_date, end_date):
-    stock_data = yf.download(ticker, start=start_date, end=end_date, interval='1d')
+import os
+import shutil
+
+# Numba kernels compiled ahead of time by build_numba_cache.py are shipped here
+SHIPPED_NUMBA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'numba_cache')
+
+# Function to point numba at the shipped kernel cache before numba is imported.
+# The Lambda package is read-only, so the cache is copied to /tmp when it cannot
+# be used in place; numba only needs to read it on a cache hit.
+def prepare_numba_cache():
+    if 'NUMBA_CACHE_DIR' in os.environ or not os.path.isdir(SHIPPED_NUMBA_CACHE):
+        return
+    if os.access(SHIPPED_NUMBA_CACHE, os.W_OK):
+        os.environ['NUMBA_CACHE_DIR'] = SHIPPED_NUMBA_CACHE
+    else:
+        shutil.copytree(SHIPPED_NUMBA_CACHE, '/tmp/numba_cache', dirs_exist_ok=True)
+        os.environ['NUMBA_CACHE_DIR'] = '/tmp/numba_cache'
+
+prepare_numba_cache()
+
+from result_cache import ResultCache
+
+# Results survive between invocations of a warm container (and for the whole
+# life of the local service); closed historical ranges never expire
+RESULT_CACHE = ResultCache(max_entries=int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', '256')))
+
+# pandas, yfinance and numba are imported inside the functions that use them,
+# so the init phase of a cold start only pays for what a request needs.
+# With `resample_from` set, the bars are built from that finer cached feed
+# instead of being downloaded at `interval`.
+def load_data(ticker, start_date, end_date, interval='1d', resample_from=None):
+    if resample_from:
+        from bar_resampler import load_resampled
+
+        return load_resampled(ticker, start_date, end_date, interval=interval, source_interval=resample_from)
+
+    import market_data_cache
+
+    stock_data = market_data_cache.download(ticker, start=start_date, end=end_date, interval=interval)
     return stock_data
 
-def lambda_handler(event, context):
-    ticker = event.get('ticker', 'AAPL')
-    multiplier = event.get('multiplier', 3.0)
-    length = event.get('length', 21)
-    start_date = event.get('start_date', '2024-01-01')
-    end_date = event.get('end_date', '2024-09-01')
-
-    # Load stock data
-    data = load_data(ticker, start_date, end_date)
-    
-    # Calculate ATR
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-PrevClose'] = abs(data['High'] - data['Adj Close'].shift(1))
-    data['Low-PrevClose'] = abs(data['Low'] - data['Adj Close'].shift(1))
-    data['TR'] = data[['High-Low', 'High-PrevClose', 'Low-PrevClose']].max(axis=1)
-    data['ATR'] = data['TR'].rolling(window=length).mean()
-
-    # Calculate Moving Average (MA)
-    data['MA'] = data['Adj Close'].rolling(window=length).mean()
-
-    # ATR Trailing Stop Calculation
-    result, long_stop, short_stop = nb_atrts(data['Adj Close'].values, data['MA'].values, data['ATR'].values, length, length)
+# Function to calculate ATR, MA and the ATR trailing stop on a downloaded frame.
+# Everything runs in one fused kernel pass over the raw arrays.
+def calculate_atr_trailing_stop(data, length):
+    from numpy import ascontiguousarray, float64
+    from atr_kernels import nb_atrts_fused
 
+    high = ascontiguousarray(data['High'].values, dtype=float64)
+    low = ascontiguousarray(data['Low'].values, dtype=float64)
+    close = ascontiguousarray(data['Adj Close'].values, dtype=float64)
+    atr_, ma, result, long_stop, short_stop = nb_atrts_fused(high, low, close, length, length)
+
+    data['ATR'] = atr_
+    data['MA'] = ma
     data['ATR_Trailing_Stop'] = result
     data['Long_Stop'] = long_stop
     data['Short_Stop'] = short_stop
+    return data
+
+OUTPUT_COLUMNS = ['Adj Close', 'ATR_Trailing_Stop', 'Long_Stop', 'Short_Stop']
 
-    # Convert to JSON
+# Function to read the calculation parameters of one request, falling back to defaults
+def read_parameters(request, defaults):
     return {
-        'statusCode': 200,
-        'body': data[['Adj Close', 'ATR_Trailing_Stop', 'Long_Stop', 'Short_Stop']].dropna().to_json()
+        'ticker': request.get('ticker', defaults.get('ticker', 'AAPL')),
+        'multiplier': request.get('multiplier', defaults.get('multiplier', 3.0)),
+        'length': request.get('length', defaults.get('length', 21)),
+        'start_date': request.get('start_date', defaults.get('start_date', '2024-01-01')),
+        'end_date': request.get('end_date', defaults.get('end_date', '2024-09-01')),
+        'interval': request.get('interval', defaults.get('interval', '1d')),
+        'resample_from': request.get('resample_from', defaults.get('resample_from')),
     }
+
+# Function to load several tickers sharing a date range with one multi-ticker download.
+# Resampled bars are built per ticker, each from its own stored feed, so a failure
+# there only affects its own ticker. Returns dicts of ticker -> frame and ticker -> error.
+def load_batch_data(tickers, start_date, end_date, interval='1d', resample_from=None):
+    if resample_from:
+        frames, errors = {}, {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = load_data(ticker, start_date, end_date, interval, resample_from)
+            except Exception as e:
+                errors[ticker] = e
+        return frames, errors
+
+    import market_data_cache
+
+    data = market_data_cache.download(tickers, start=start_date, end=end_date, interval=interval)
+    return {ticker: data.xs(ticker, axis=1, level=1).dropna(how='all') for ticker in tickers}, {}
+
+def output_frame(data):
+    return data[OUTPUT_COLUMNS].dropna(subset=['ATR_Trailing_Stop'])
+
+# Function to key a request's result on its full parameter tuple; the result
+# cache adds the version of the cached bars it is computed from
+def result_key(request):
+    return ('atr_trailing_stop', request['ticker'], request['multiplier'], request['length'],
+            str(request['start_date']), str(request['end_date']), request['interval'], request['resample_from'])
+
+def data_version(request):
+    import market_data_cache
+
+    return market_data_cache.data_version(request['ticker'], request['resample_from'] or request['interval'])
+
+# Function to encode the output frame in the format requested by the event.
+# 'json' keeps the original DataFrame.to_json() shape.
+def encode_output(frame, fmt):
+    from response_encoding import encode_frame
+
+    if fmt == 'json':
+        return frame.to_json()
+    return encode_frame(frame, fmt)
+
+# Function to get the bars a request needs: its date range and interval
+def data_range(request):
+    return request['start_date'], request['end_date'], request['interval'], request['resample_from']
+
+# Function to serve a batch event. `tickers` holds symbols or objects with a
+# `ticker` and optional per-ticker parameters; top-level event fields are the
+# defaults. Each ticker gets its own result so one failure does not fail the batch;
+# a ticker listed twice is rejected with 400.
+def batch_handler(event, fmt, compress):
+    from collections import Counter
+    from response_encoding import build_response
+
+    # A bare string would be read one character per ticker
+    if not isinstance(event['tickers'], list):
+        return build_response({'error': "'tickers' must be a list of symbols or objects."}, compress, 400)
+
+    requests = [read_parameters({'ticker': item} if isinstance(item, str) else item, event)
+                for item in event['tickers']]
+
+    # Results are keyed by ticker, so a ticker may only appear once per batch
+    counts = Counter(request['ticker'] for request in requests)
+    duplicates = sorted(ticker for ticker, count in counts.items() if count > 1)
+    if duplicates:
+        return build_response({'error': f"Duplicate tickers in batch: {', '.join(duplicates)}."}, compress, 400)
+
+    # Serve what the result cache holds, then one download per distinct date range and interval.
+    # The download is shared across tickers, so lookups and stores happen separately here.
+    cached = {}
+    ranges = {}
+    for i, request in enumerate(requests):
+        frame = RESULT_CACHE.get(result_key(request) + (data_version(request),))
+        if frame is not None:
+            cached[i] = frame
+            continue
+        ranges.setdefault(data_range(request), []).append(request['ticker'])
+
+    frames, errors = {}, {}
+    for data_key, tickers in ranges.items():
+        tickers = list(dict.fromkeys(tickers))
+        try:
+            loaded, failed = load_batch_data(tickers, *data_key)
+        except Exception as e:
+            loaded, failed = {}, {ticker: e for ticker in tickers}
+        for ticker, data in loaded.items():
+            frames[(ticker, *data_key)] = data
+        for ticker, e in failed.items():
+            errors[(ticker, *data_key)] = f"Error fetching data: {e}"
+
+    results = {}
+    for i, request in enumerate(requests):
+        key = (request['ticker'], *data_range(request))
+        if i in cached:
+            output = encode_output(cached[i], fmt)
+            results[request['ticker']] = {'statusCode': 200, 'data': json.loads(output) if fmt == 'json' else output}
+            continue
+        if key in errors:
+            results[request['ticker']] = {'statusCode': 502, 'error': errors[key]}
+            continue
+        if frames[key].empty:
+            results[request['ticker']] = {'statusCode': 404, 'error': "No data available for the selected inputs."}
+            continue
+        try:
+            frame = output_frame(calculate_atr_trailing_stop(frames[key].copy(), request['length']))
+            RESULT_CACHE.put(result_key(request) + (data_version(request),), frame, request['end_date'])
+            output = encode_output(frame, fmt)
+            results[request['ticker']] = {'statusCode': 200, 'data': json.loads(output) if fmt == 'json' else output}
+        except Exception as e:
+            results[request['ticker']] = {'statusCode': 500, 'error': f"Error calculating trailing stop: {e}"}
+
+    print(json.dumps({'result_cache': RESULT_CACHE.stats()}))
+    return build_response(results, compress)
+
+# Events may set `format` to 'json' (default), 'columnar' or 'binary', and
+# `gzip` to compress the body; see response_encoding.py for the layouts.
+# `interval` sets the bar size (default '1d') and `resample_from` a finer
+# cached interval to build those bars from, e.g. '1h' bars from a '1m' feed.
+def lambda_handler(event, context):
+    from response_encoding import FORMATS, build_response
+
+    fmt = event.get('format', 'json')
+    compress = bool(event.get('gzip', False))
+    if fmt not in FORMATS:
+        return build_response({'error': f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}."}, status_code=400)
+
+    if 'tickers' in event:
+        return batch_handler(event, fmt, compress)
+
+    request = read_parameters(event, {})
+
+    # Load stock data and calculate, unless an identical request is cached.
+    # No bars (yfinance also reports failures that way) gives None, which is not cached.
+    def compute():
+        data = load_data(request['ticker'], request['start_date'], request['end_date'],
+                         request['interval'], request['resample_from'])
+        if data.empty:
+            return None
+        return output_frame(calculate_atr_trailing_stop(data, request['length']))
+
+    frame = RESULT_CACHE.get_or_compute(result_key(request), compute, request['end_date'],
+                                        version=lambda: data_version(request))
+    print(json.dumps({'result_cache': RESULT_CACHE.stats()}))
+    if frame is None:
+        return build_response({'error': "No data available for the selected inputs."}, compress, 404)
+
+    # Convert to the requested format
+    return build_response(encode_output(frame, fmt), compress)
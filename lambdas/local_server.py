@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from lambda_atr_trailing_stop import RESULT_CACHE, lambda_handler
+
+# Query string fields that are not plain strings in the Lambda event
+INT_FIELDS = {'length'}
+FLOAT_FIELDS = {'multiplier'}
+BOOL_FIELDS = {'gzip'}
+LIST_FIELDS = {'tickers'}
+
+# Function to turn GET query parameters into a Lambda event
+def event_from_query(query):
+    event = {}
+    for name, values in parse_qs(query).items():
+        value = values[-1]
+        if name in INT_FIELDS:
+            event[name] = int(value)
+        elif name in FLOAT_FIELDS:
+            event[name] = float(value)
+        elif name in BOOL_FIELDS:
+            event[name] = value.lower() in ('1', 'true', 'yes')
+        elif name in LIST_FIELDS:
+            event[name] = [ticker.strip() for ticker in value.split(',') if ticker.strip()]
+        else:
+            event[name] = value
+    return event
+
+# Long-lived local service around lambda_handler.
+# The numba kernels and market data cache stay warm between requests, CPU work
+# runs in a thread pool so the event loop keeps accepting connections, and
+# concurrent identical events share one computation.
+class ATRServer:
+    def __init__(self, workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.in_flight = {}
+
+    async def compute(self, event):
+        """
+        Run lambda_handler for an event, joining an identical computation if one
+        is already running.
+
+        :return: (response, compute seconds, whether the result was coalesced)
+        """
+        key = json.dumps(event, sort_keys=True)
+        future = self.in_flight.get(key)
+        if future is not None:
+            response, seconds = await asyncio.shield(future)
+            return response, seconds, True
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight[key] = future
+        try:
+            started = time.perf_counter()
+            response = await loop.run_in_executor(self.executor, lambda_handler, event, None)
+            result = (response, time.perf_counter() - started)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; retrieve it so asyncio does not warn
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+        return result[0], result[1], False
+
+    async def handle(self, reader, writer):
+        started = time.perf_counter()
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            method, target, _ = request_line.split(' ', 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+            url = urlsplit(target)
+            if method == 'GET' and url.path == '/stats':
+                payload = json.dumps({'result_cache': RESULT_CACHE.stats(), 'in_flight': len(self.in_flight)})
+                await self.respond(writer, HTTPStatus.OK, {'Content-Type': 'application/json'}, payload.encode())
+                return
+            if method == 'GET':
+                event = event_from_query(url.query)
+            elif method == 'POST':
+                event = json.loads(body or b'{}')
+            else:
+                await self.respond(writer, HTTPStatus.METHOD_NOT_ALLOWED, {}, b'')
+                return
+
+            response, compute_seconds, coalesced = await self.compute(event)
+        except (ValueError, json.JSONDecodeError) as e:
+            await self.respond(writer, HTTPStatus.BAD_REQUEST, {}, json.dumps({'error': str(e)}).encode())
+            return
+        except Exception as e:
+            await self.respond(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {}, json.dumps({'error': str(e)}).encode())
+            return
+
+        payload = response.get('body', '')
+        payload = base64.b64decode(payload) if response.get('isBase64Encoded') else payload.encode('utf-8')
+        total_seconds = time.perf_counter() - started
+        headers = {
+            'Content-Type': 'application/json',
+            **response.get('headers', {}),
+            'X-Coalesced': 'true' if coalesced else 'false',
+            'X-Compute-Time-Ms': f'{compute_seconds * 1000:.2f}',
+            'X-Total-Time-Ms': f'{total_seconds * 1000:.2f}',
+            'Server-Timing': f'compute;dur={compute_seconds * 1000:.2f}, total;dur={total_seconds * 1000:.2f}',
+        }
+        await self.respond(writer, HTTPStatus(response.get('statusCode', 200)), headers, payload)
+
+    async def respond(self, writer, status, headers, payload):
+        lines = [f'HTTP/1.1 {status.value} {status.phrase}', f'Content-Length: {len(payload)}', 'Connection: close']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+async def serve(host, port, workers):
+    server = ATRServer(workers)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"ATR trailing stop service listening on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ATR trailing stop Lambda as a local HTTP service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help="Threads for the CPU-bound calculations")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.workers))
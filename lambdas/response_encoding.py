@@ -0,0 +1,71 @@
+import base64
+import gzip
+import json
+
+import numpy as np
+
+FORMATS = ('json', 'columnar', 'binary')
+
+# Function to encode a DatetimeIndex as integers since the epoch.
+# Daily bars use epoch days; anything with a time of day falls back to seconds.
+def encode_index(index):
+    values = index.values.astype('datetime64[s]').astype(np.int64)
+    if (values % 86400 == 0).all():
+        return values // 86400, 'D'
+    return values, 's'
+
+# Function to encode a frame as one shared index plus one array per column.
+# 'columnar' keeps plain JSON numbers (NaN as null); 'binary' packs the index as
+# little-endian int64 and every column as little-endian float32, base64 encoded.
+def encode_frame(frame, fmt='columnar', precision=6):
+    index, unit = encode_index(frame.index)
+
+    if fmt == 'columnar':
+        columns = {}
+        for name in frame.columns:
+            values = np.round(frame[name].to_numpy(dtype=np.float64), precision)
+            columns[name] = [None if np.isnan(v) else v for v in values.tolist()]
+        return {'index': index.tolist(), 'index_unit': unit, 'columns': columns}
+
+    if fmt == 'binary':
+        columns = {name: base64.b64encode(frame[name].to_numpy(dtype='<f4').tobytes()).decode('ascii')
+                   for name in frame.columns}
+        return {
+            'index': base64.b64encode(index.astype('<i8').tobytes()).decode('ascii'),
+            'index_unit': unit,
+            'dtype': 'float32',
+            'length': len(frame),
+            'columns': columns,
+        }
+
+    raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}.")
+
+# Function to decode either encoding back into a DataFrame, for clients and tests
+def decode_frame(payload):
+    import pandas as pd
+
+    unit = payload['index_unit']
+    if 'dtype' in payload:
+        index = np.frombuffer(base64.b64decode(payload['index']), dtype='<i8')
+        columns = {name: np.frombuffer(base64.b64decode(values), dtype='<f4')
+                   for name, values in payload['columns'].items()}
+    else:
+        index = np.asarray(payload['index'], dtype=np.int64)
+        columns = {name: np.array(values, dtype=np.float64) for name, values in payload['columns'].items()}
+    return pd.DataFrame(columns, index=pd.to_datetime(index, unit=unit))
+
+# Function to build the Lambda response, gzip-compressing the body when asked.
+# Compressed bodies are base64 encoded as API Gateway expects for binary payloads.
+def build_response(body, compress=False, status_code=200):
+    if not isinstance(body, str):
+        body = json.dumps(body, separators=(',', ':'))
+
+    if not compress:
+        return {'statusCode': status_code, 'body': body}
+
+    return {
+        'statusCode': status_code,
+        'headers': {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'},
+        'isBase64Encoded': True,
+        'body': base64.b64encode(gzip.compress(body.encode('utf-8'))).decode('ascii'),
+    }
@@ -0,0 +1,267 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pandas as pd
+import yfinance as yf
+
+# Where the cache lives; on Lambda only /tmp is writable
+if os.environ.get('MARKET_DATA_CACHE_DIR'):
+    CACHE_DIR = os.environ['MARKET_DATA_CACHE_DIR']
+elif os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    CACHE_DIR = '/tmp/market_data'
+else:
+    CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'atr_trailing_stop')
+
+# How long bars for the current trading day are trusted before re-fetching
+MAX_AGE = timedelta(minutes=int(os.environ.get('MARKET_DATA_MAX_AGE_MINUTES', '15')))
+
+# How long a past segment that came back empty before a symbol's listing is trusted to stay empty
+EMPTY_MAX_AGE = timedelta(hours=int(os.environ.get('MARKET_DATA_EMPTY_MAX_AGE_HOURS', '24')))
+
+# Covered days without bars before a symbol's first bar that mark it as not listed yet,
+# longer than any run of weekends and holidays
+LISTING_LOOKBACK = timedelta(days=7)
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+COLUMNS = ['open', 'high', 'low', 'close', 'adj_close', 'volume']
+
+def connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(CACHE_DIR, 'market_data.sqlite'), timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bars (
+            symbol TEXT, interval TEXT, ts TEXT,
+            open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL,
+            PRIMARY KEY (symbol, interval, ts)
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS coverage (
+            symbol TEXT, interval TEXT, start TEXT, end TEXT, fetched_at TEXT,
+            PRIMARY KEY (symbol, interval)
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS empty_segments (
+            symbol TEXT, interval TEXT, start TEXT, end TEXT, fetched_at TEXT,
+            PRIMARY KEY (symbol, interval, start, end)
+        )""")
+    return conn
+
+def to_timestamp(value):
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize(None) if timestamp.tzinfo else timestamp
+
+def get_coverage(conn, symbol, interval):
+    row = conn.execute("SELECT start, end, fetched_at FROM coverage WHERE symbol = ? AND interval = ?",
+                       (symbol, interval)).fetchone()
+    if row is None:
+        return None
+    return pd.Timestamp(row[0]), pd.Timestamp(row[1]), datetime.fromisoformat(row[2])
+
+def last_stored_bar(conn, symbol, interval):
+    row = conn.execute("SELECT MAX(ts) FROM bars WHERE symbol = ? AND interval = ?", (symbol, interval)).fetchone()
+    return pd.Timestamp(row[0]) if row[0] else None
+
+def first_stored_bar(conn, symbol, interval):
+    row = conn.execute("SELECT MIN(ts) FROM bars WHERE symbol = ? AND interval = ?", (symbol, interval)).fetchone()
+    return pd.Timestamp(row[0]) if row[0] else None
+
+# Function to check whether an empty fetch of [start, end) can be trusted.
+# yfinance reports failures and ranges without bars alike, as empty frames, so only
+# a range before the listing is trusted: it ends at or before the first stored bar,
+# and an earlier successful fetch already covered more than LISTING_LOOKBACK without
+# bars before that bar.
+def before_listing(conn, symbol, interval, end):
+    coverage = get_coverage(conn, symbol, interval)
+    first_bar = first_stored_bar(conn, symbol, interval)
+    if coverage is None or first_bar is None:
+        return False
+    return end <= first_bar and first_bar - coverage[0] > LISTING_LOOKBACK
+
+def missing_segments(conn, symbol, interval, start, end, max_age, now):
+    """
+    Work out which [start, end) ranges must be fetched so that the cached coverage
+    of a symbol spans the requested range.
+
+    The coverage is kept as one contiguous range, so a request that lies beyond it
+    is bridged back to the covered part instead of leaving a hole.
+    """
+    coverage = get_coverage(conn, symbol, interval)
+    if coverage is None:
+        return [(start, end)]
+
+    covered_start, covered_end, fetched_at = coverage
+    segments = []
+    if start < covered_start:
+        segments.append((start, covered_start))
+
+    # The last stored bar is re-fetched too, it may have been a partial session
+    tail_start = min(covered_end, last_stored_bar(conn, symbol, interval) or covered_end)
+    if end > covered_end:
+        segments.append((tail_start, end))
+    elif end > now.replace(hour=0, minute=0, second=0, microsecond=0) and now - fetched_at > max_age:
+        segments.append((tail_start, end))
+
+    return [segment for segment in segments if not known_empty(conn, symbol, interval, *segment, max_age, now)]
+
+# Function to check whether the exchange calendar has any session in [start, end).
+# Ranges the rule calendar does not span are assumed to have sessions.
+def has_sessions(start, end):
+    import trading_calendar
+
+    calendar = trading_calendar.get_calendar(None)
+    first_day, end_day = start.normalize(), (end - pd.Timedelta(1)).normalize() + pd.Timedelta(days=1)
+    if first_day < pd.Timestamp(calendar.start) or end_day > pd.Timestamp(calendar.end):
+        return True
+    return calendar.session_count(first_day, end_day) > 0
+
+# Function to check for a recent empty fetch of a range containing [start, end).
+# Ranges reaching today are only trusted for max_age, like the bars themselves.
+def known_empty(conn, symbol, interval, start, end, max_age, now):
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    fetched_after = now - (max_age if end > today else EMPTY_MAX_AGE)
+    row = conn.execute("SELECT 1 FROM empty_segments WHERE symbol = ? AND interval = ? "
+                       "AND start <= ? AND end >= ? AND fetched_at >= ?",
+                       (symbol, interval, start.isoformat(), end.isoformat(), fetched_after.isoformat())).fetchone()
+    return row is not None
+
+def record_empty(conn, symbol, interval, start, end, now):
+    conn.execute("INSERT OR REPLACE INTO empty_segments VALUES (?, ?, ?, ?, ?)",
+                 (symbol, interval, start.isoformat(), end.isoformat(), now.isoformat()))
+
+def fetch(symbols, start, end, interval):
+    """
+    Download one range for several symbols in a single request.
+
+    :return: Dict of symbol -> frame with FIELDS columns
+    """
+    data = yf.download(symbols, start=start, end=end, interval=interval,
+                       auto_adjust=False, group_by='ticker', progress=False)
+    frames = {}
+    for symbol in symbols:
+        if data.empty:
+            frames[symbol] = pd.DataFrame(columns=FIELDS)
+        elif isinstance(data.columns, pd.MultiIndex):
+            frames[symbol] = data[symbol] if symbol in data.columns.get_level_values(0) else pd.DataFrame(columns=FIELDS)
+        else:
+            frames[symbol] = data
+    return frames
+
+def store(conn, symbol, interval, frame):
+    frame = frame.reindex(columns=FIELDS).dropna(how='all')
+    index = frame.index.tz_localize(None) if getattr(frame.index, 'tz', None) else frame.index
+    rows = [(symbol, interval, ts.isoformat(), *values)
+            for ts, values in zip(index, frame.to_numpy(dtype=float).tolist())]
+    conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+def update_coverage(conn, symbol, interval, start, end, now):
+    coverage = get_coverage(conn, symbol, interval)
+    if coverage is not None:
+        start, end = min(start, coverage[0]), max(end, coverage[1])
+    conn.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?, ?)",
+                 (symbol, interval, start.isoformat(), end.isoformat(), now.isoformat()))
+
+def load(conn, symbol, interval, start, end):
+    rows = conn.execute(f"SELECT ts, {', '.join(COLUMNS)} FROM bars "
+                        "WHERE symbol = ? AND interval = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                        (symbol, interval, start.isoformat(), end.isoformat())).fetchall()
+    frame = pd.DataFrame([row[1:] for row in rows], columns=FIELDS,
+                         index=pd.DatetimeIndex([row[0] for row in rows], name='Date'), dtype=float)
+    return frame
+
+# Function to fetch whatever part of [start, end) is not cached yet for each symbol
+def refresh(conn, symbols, interval, start, end, max_age, now):
+    # Group symbols missing the same range so each range is one request
+    pending = {}
+    for symbol in symbols:
+        for segment in missing_segments(conn, symbol, interval, start, end, max_age, now):
+            pending.setdefault(segment, []).append(symbol)
+
+    for (segment_start, segment_end), segment_symbols in pending.items():
+        # Weekends and holidays have no bars to fetch, the range is simply covered
+        if not has_sessions(segment_start, segment_end):
+            with conn:
+                for symbol in segment_symbols:
+                    update_coverage(conn, symbol, interval, segment_start, segment_end, now)
+            continue
+
+        frames = fetch(segment_symbols, segment_start, segment_end, interval)
+        with conn:
+            for symbol, frame in frames.items():
+                # yfinance reports failures as empty frames, so an empty segment is
+                # never recorded as covered; one known to lie before the listing is
+                # remembered for a while, so it is not re-fetched on every request
+                if frame.dropna(how='all').empty:
+                    if before_listing(conn, symbol, interval, segment_end):
+                        record_empty(conn, symbol, interval, segment_start, segment_end, now)
+                    continue
+                store(conn, symbol, interval, frame)
+                update_coverage(conn, symbol, interval, segment_start, segment_end, now)
+
+# Function to turn a requested range into timestamps, capping the end at tomorrow
+def request_range(start, end, now):
+    tomorrow = pd.Timestamp(now.date()) + timedelta(days=1)
+    return to_timestamp(start), tomorrow if end is None else min(to_timestamp(end), tomorrow)
+
+def download(tickers, start, end=None, interval='1d', max_age=None):
+    """
+    Drop-in for yf.download that serves bars from the local cache and only fetches
+    the head/tail segments that are not cached yet.
+
+    :param tickers: Symbol or list of symbols
+    :param start: Start date (inclusive)
+    :param end: End date (exclusive), defaults to tomorrow
+    :param interval: yfinance interval, cached separately per interval
+    :param max_age: How long bars covering today stay fresh, defaults to MAX_AGE
+    :return: Frame with FIELDS columns for one symbol, (field, symbol) columns for a list
+    """
+    symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+    now = datetime.now()
+    max_age = MAX_AGE if max_age is None else max_age
+    start, end = request_range(start, end, now)
+
+    conn = connect()
+    try:
+        refresh(conn, symbols, interval, start, end, max_age, now)
+        frames = {symbol: load(conn, symbol, interval, start, end) for symbol in symbols}
+    finally:
+        conn.close()
+
+    if isinstance(tickers, str):
+        return frames[tickers]
+    # Symbols cover different dates; concat would order the union by first appearance
+    return pd.concat(frames, axis=1).sort_index().swaplevel(axis=1).reindex(columns=FIELDS, level=0)
+
+# Function to stream a symbol's cached bars in chunks of `chunk_size` rows.
+# Missing segments are fetched first, as in download; the bars are then read
+# with a cursor, so long intraday histories never sit in memory at once.
+def iter_bars(symbol, start, end=None, interval='1d', chunk_size=50000, max_age=None):
+    now = datetime.now()
+    max_age = MAX_AGE if max_age is None else max_age
+    start, end = request_range(start, end, now)
+
+    conn = connect()
+    try:
+        refresh(conn, [symbol], interval, start, end, max_age, now)
+        cursor = conn.execute(f"SELECT ts, {', '.join(COLUMNS)} FROM bars "
+                              "WHERE symbol = ? AND interval = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                              (symbol, interval, start.isoformat(), end.isoformat()))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield pd.DataFrame([row[1:] for row in rows], columns=FIELDS,
+                               index=pd.DatetimeIndex([row[0] for row in rows], name='Date'), dtype=float)
+    finally:
+        conn.close()
+
+# Function to get a stamp that changes whenever new bars are fetched for a symbol,
+# so results computed from the cache can be keyed on the data they were built from
+def data_version(symbol, interval='1d'):
+    conn = connect()
+    try:
+        row = conn.execute("SELECT end, fetched_at FROM coverage WHERE symbol = ? AND interval = ?",
+                           (symbol, interval)).fetchone()
+    finally:
+        conn.close()
+    return None if row is None else f"{row[0]}@{row[1]}"
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+# Function to find the next regular session open after `now`, weekends and
+# exchange holidays skipped. `calendar` defaults to the rule-based calendar, so
+# picking an expiry never downloads the reference history. trading_calendar is
+# imported here, it pulls in numpy and pandas, which the Lambda loads lazily.
+def next_market_open(now, calendar=None):
+    import trading_calendar
+
+    calendar = calendar or trading_calendar.get_calendar(None)
+    day = now.date()
+    if not calendar.is_session(day) or datetime.combine(day, MARKET_OPEN, MARKET_TZ) <= now:
+        day = calendar.next_session(day).astype(object)
+    return datetime.combine(day, MARKET_OPEN, MARKET_TZ)
+
+def is_market_hours(now, calendar=None):
+    import trading_calendar
+
+    calendar = calendar or trading_calendar.get_calendar(None)
+    return MARKET_OPEN <= now.time() < MARKET_CLOSE and calendar.is_session(now.date())
+
+# Function to work out when a result for a date range goes stale.
+# A range that ends before today holds only closed sessions and never expires;
+# a range reaching today is kept for `live_ttl` during market hours and until
+# the next open outside them, since no new bars arrive in between.
+def expiry_for(end_date, live_ttl, now=None, calendar=None):
+    now = now or datetime.now(MARKET_TZ)
+    if end_date is not None and datetime.fromisoformat(str(end_date)[:10]).date() <= now.date():
+        return None
+    if is_market_hours(now, calendar):
+        return now + live_ttl
+    return next_market_open(now, calendar)
+
+# Size-bounded LRU cache with per-entry expiry and hit/miss counters.
+# Thread-safe, so the local service's worker threads can share one instance.
+class ResultCache:
+    def __init__(self, max_entries=256, live_ttl=timedelta(minutes=5)):
+        self.max_entries = max_entries
+        self.live_ttl = live_ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and datetime.now(MARKET_TZ) >= expires_at:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, end_date=None):
+        """
+        Store a value; its expiry follows the market-hours policy of expiry_for.
+
+        :param end_date: End of the date range the value was computed for
+        """
+        expires_at = expiry_for(end_date, self.live_ttl)
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, end_date=None, version=None):
+        """
+        Return the cached value for `key + (version(),)`, computing it on a miss.
+
+        :param compute: Zero-argument function producing the value, or None for a
+            result that must not be cached (e.g. no data yet)
+        :param end_date: End of the date range, drives the expiry
+        :param version: Optional zero-argument function returning a data-version
+            stamp; it is read again after computing, since computing may fetch data
+        :return: The cached or freshly computed value
+        """
+        value = self.get(key + (version() if version else None,))
+        if value is not None:
+            return value
+        value = compute()
+        if value is not None:
+            self.put(key + (version() if version else None,), value, end_date)
+        return value
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,135 @@
+import argparse
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import yfinance as yf
+
+from market_data_cache import CACHE_DIR
+
+# How long looked-up metadata is trusted; unknown symbols are re-checked sooner,
+# since a symbol that does not resolve today may be listed tomorrow
+TTL = timedelta(days=int(os.environ.get('SYMBOL_METADATA_TTL_DAYS', '7')))
+NEGATIVE_TTL = timedelta(hours=int(os.environ.get('SYMBOL_METADATA_NEGATIVE_TTL_HOURS', '24')))
+
+def connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(CACHE_DIR, 'symbol_metadata.sqlite'), timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS symbols (
+            symbol TEXT PRIMARY KEY, short_name TEXT, quote_type TEXT, info_symbol TEXT,
+            valid INTEGER, validated_at TEXT
+        )""")
+    return conn
+
+def row_to_metadata(row):
+    return {
+        'symbol': row[0],
+        'short_name': row[1],
+        'quote_type': row[2],
+        'info_symbol': row[3],
+        'valid': bool(row[4]),
+        'validated_at': datetime.fromisoformat(row[5]),
+    }
+
+def is_fresh(metadata, now, ttl, negative_ttl):
+    return now - metadata['validated_at'] <= (ttl if metadata['valid'] else negative_ttl)
+
+# Function to read cached entries for many symbols, 500 per query to stay
+# under SQLite's bound-parameter limit
+def cached(conn, symbols):
+    symbols = list(symbols)
+    entries = {}
+    for i in range(0, len(symbols), 500):
+        chunk = symbols[i:i + 500]
+        rows = conn.execute(f"SELECT * FROM symbols WHERE symbol IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+        entries.update({row[0]: row_to_metadata(row) for row in rows})
+    return entries
+
+# Function to fetch Ticker.info and keep the fields the validators use.
+# A symbol is valid when Yahoo reports both a name and a quote type for it.
+# Network errors propagate and are never cached.
+def fetch_metadata(symbol, now):
+    info = yf.Ticker(symbol).info or {}
+    short_name, quote_type = info.get('shortName'), info.get('quoteType')
+    return {
+        'symbol': symbol,
+        'short_name': short_name,
+        'quote_type': quote_type,
+        'info_symbol': info.get('symbol'),
+        'valid': bool(short_name and quote_type),
+        'validated_at': now,
+    }
+
+def store(conn, metadata):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO symbols VALUES (?, ?, ?, ?, ?, ?)",
+                     (metadata['symbol'], metadata['short_name'], metadata['quote_type'], metadata['info_symbol'],
+                      int(metadata['valid']), metadata['validated_at'].isoformat()))
+
+def lookup(symbol, ttl=None, negative_ttl=None, refresh=False):
+    """
+    Get a symbol's metadata from the local store, fetching Ticker.info only when the
+    entry is missing or older than its TTL.
+
+    :param ttl: How long a valid entry stays fresh, defaults to TTL
+    :param negative_ttl: How long an invalid entry stays fresh, defaults to NEGATIVE_TTL
+    :param refresh: Always fetch, e.g. to re-validate on request
+    :return: Dict with symbol, short_name, quote_type, info_symbol, valid and validated_at
+    """
+    now = datetime.now()
+    ttl = TTL if ttl is None else ttl
+    negative_ttl = NEGATIVE_TTL if negative_ttl is None else negative_ttl
+
+    conn = connect()
+    try:
+        metadata = cached(conn, [symbol]).get(symbol)
+        if metadata is not None and not refresh and is_fresh(metadata, now, ttl, negative_ttl):
+            return metadata
+        metadata = fetch_metadata(symbol, now)
+        store(conn, metadata)
+        return metadata
+    finally:
+        conn.close()
+
+def warm_up(symbols, workers=8, refresh=False):
+    """
+    Pre-populate the store for a symbol list, fetching only missing or stale entries.
+
+    :return: Dict with counts of fresh, fetched and failed symbols
+    """
+    now = datetime.now()
+    symbols = list(dict.fromkeys(symbols))
+    conn = connect()
+    try:
+        entries = {} if refresh else cached(conn, symbols)
+    finally:
+        conn.close()
+    pending = [symbol for symbol in symbols
+               if symbol not in entries or not is_fresh(entries[symbol], now, TTL, NEGATIVE_TTL)]
+
+    def fetch(symbol):
+        try:
+            lookup(symbol, refresh=True)
+            return True
+        except Exception:
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = sum(executor.map(fetch, pending))
+    return {'fresh': len(symbols) - len(pending), 'fetched': fetched, 'failed': len(pending) - fetched}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-populate the symbol metadata store.")
+    parser.add_argument('symbols', nargs='*', help="Symbols to look up")
+    parser.add_argument('--file', help="Text file with symbols separated by whitespace or commas")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--refresh', action='store_true', help="Re-fetch entries that are still fresh")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file) as f:
+            symbols += [symbol.strip() for symbol in f.read().replace(',', ' ').split() if symbol.strip()]
+    print(warm_up(symbols, workers=args.workers, refresh=args.refresh))
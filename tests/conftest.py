@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The apps import their neighbours with flat imports, as when run from their own directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ('', 'atr_trailing_stop', 'lambdas', 'invalid_symbols', 'benchmarks'):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+
+import market_data_cache
+
+# Stand-in for yf.download: business-day bars for each symbol inside its listed span,
+# nothing at all for symbols without one. Every call is recorded.
+class FakeDownloader:
+    def __init__(self, listings):
+        self.listings = listings
+        self.calls = []
+
+    def __call__(self, symbols, start, end, interval='1d', **kwargs):
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        self.calls.append((tuple(symbols), pd.Timestamp(start), pd.Timestamp(end)))
+        frames = {}
+        for symbol in symbols:
+            if symbol not in self.listings:
+                continue
+            first, last = (pd.Timestamp(day) for day in self.listings[symbol])
+            index = pd.bdate_range(max(pd.Timestamp(start), first), min(pd.Timestamp(end) - pd.Timedelta(days=1), last))
+            close = 100 + np.arange(len(index), dtype=float)
+            frames[symbol] = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                                           'Adj Close': close, 'Volume': 1000.0}, index=index)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_data_cache, 'CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+@pytest.fixture
+def fake_download(cache_dir, monkeypatch):
+    def install(listings):
+        downloader = FakeDownloader(listings)
+        monkeypatch.setattr(market_data_cache.yf, 'download', downloader)
+        return downloader
+    return install
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+import reference_atr
+
+def ohlc(n_bars, seed=0, nan_closes=()):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n_bars))
+    high = close + rng.uniform(0, 2, n_bars)
+    low = close - rng.uniform(0, 2, n_bars)
+    close[list(nan_closes)] = np.nan
+    index = pd.bdate_range('2024-01-01', periods=n_bars)
+    return pd.DataFrame({'High': high, 'Low': low, 'Close': close}, index=index)
+
+CASES = [
+    pytest.param(ohlc(300), 21, id='long'),
+    pytest.param(ohlc(25, seed=1), 21, id='barely-enough'),
+    pytest.param(ohlc(10, seed=2), 21, id='short'),
+    pytest.param(ohlc(120, seed=3), 1, id='period-1'),
+    pytest.param(ohlc(200, seed=4, nan_closes=[0, 50, 51, 199]), 14, id='nan-closes'),
+]
+
+@pytest.mark.parametrize('df, period', CASES)
+def test_calculate_atr_matches_reference(df, period):
+    expected = reference_atr.calculate_atr(df['High'], df['Low'], df['Close'], period)
+    actual = app.calculate_atr(df['High'], df['Low'], df['Close'], period)
+
+    assert np.array_equal(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), equal_nan=True)
+
+@pytest.mark.parametrize('multiplier', [1.0, 2.5, 3.0, 7.3])
+@pytest.mark.parametrize('df, period', CASES)
+def test_calculate_trailing_stop_matches_reference(df, period, multiplier):
+    df = df.copy()
+    df['ATR'] = reference_atr.calculate_atr(df['High'], df['Low'], df['Close'], period)
+
+    expected = reference_atr.calculate_trailing_stop(df, multiplier, period)
+    actual = app.calculate_trailing_stop(df, multiplier, period)
+
+    assert np.array_equal(actual.to_numpy(), expected.to_numpy(), equal_nan=True)
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+import atr_engine
+from atr_stream import TrailingStopState
+
+def test_from_history_accepts_series_and_updates_match_batch():
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, 300))
+    df = pd.DataFrame({'High': close + rng.uniform(0, 2, 300), 'Low': close - rng.uniform(0, 2, 300), 'Close': close},
+                      index=pd.bdate_range('2023-01-02', periods=300))
+    seed = df.iloc[:200]
+
+    state = TrailingStopState.from_history(seed['High'], seed['Low'], seed['Close'], 21, 3.0)
+    streamed = [state.update(row.High, row.Low, row.Close) for row in df.iloc[200:].itertuples()]
+
+    atr = atr_engine.atr(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), 21)
+    stop, _, _ = atr_engine.trailing_stop(df['Close'].to_numpy(), atr, 3.0)
+    assert np.array_equal(np.array(streamed), stop[200:], equal_nan=True)
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import lambda_atr_trailing_stop
+from lambda_atr_trailing_stop import lambda_handler
+
+@pytest.fixture(autouse=True)
+def empty_result_cache():
+    lambda_atr_trailing_stop.RESULT_CACHE.entries.clear()
+
+def batch(tickers, **event):
+    response = lambda_handler({'tickers': tickers, 'start_date': '2024-01-01', 'end_date': '2024-06-01',
+                               'length': 5, **event}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def test_batch_result_does_not_depend_on_other_tickers(fake_download):
+    fake_download({'NEWCO': ('2024-04-01', '2024-06-01'), 'AAA': ('2023-01-01', '2024-06-01')})
+    lambda_handler({'ticker': 'NEWCO', 'start_date': '2024-01-01', 'end_date': '2024-06-01', 'length': 5}, None)
+
+    _, mixed = batch(['NEWCO', 'BAD', 'AAA'])
+    lambda_atr_trailing_stop.RESULT_CACHE.entries.clear()
+    _, alone = batch(['AAA'])
+
+    assert mixed['AAA'] == alone['AAA']
+    assert mixed['BAD']['statusCode'] == 404
+
+def test_duplicate_tickers_are_rejected(fake_download):
+    fake_download({'AAA': ('2023-01-01', '2024-06-01')})
+
+    status, body = batch(['AAA', {'ticker': 'AAA', 'length': 10}])
+
+    assert status == 400
+    assert 'AAA' in body['error']
+
+def test_repeated_request_is_served_from_the_result_cache(fake_download):
+    downloader = fake_download({'AAA': ('2023-01-01', '2024-06-01')})
+    event = {'ticker': 'AAA', 'start_date': '2024-01-01', 'end_date': '2024-06-01', 'length': 5}
+
+    first = lambda_handler(event, None)
+    hits = lambda_atr_trailing_stop.RESULT_CACHE.hits
+    second = lambda_handler(event, None)
+
+    assert second['body'] == first['body']
+    assert lambda_atr_trailing_stop.RESULT_CACHE.hits == hits + 1
+    assert len(downloader.calls) == 1
+
+def test_empty_download_is_not_cached(fake_download):
+    downloader = fake_download({})
+    event = {'ticker': 'LATE', 'start_date': '2024-01-01', 'end_date': '2024-06-01', 'length': 5}
+
+    first = lambda_handler(event, None)
+    downloader.listings['LATE'] = ('2023-01-01', '2024-06-01')
+    second = lambda_handler(event, None)
+
+    assert first['statusCode'] == 404
+    assert second['statusCode'] == 200
+    assert json.loads(second['body'])
+
+def test_handler_module_imports_only_the_standard_library():
+    import os
+    import subprocess
+    import sys
+
+    code = ("import sys, lambda_atr_trailing_stop; "
+            "print(sorted({'numpy', 'pandas', 'yfinance', 'numba'} & set(sys.modules)))")
+    directory = os.path.dirname(lambda_atr_trailing_stop.__file__)
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(directory))
+    output = subprocess.run([sys.executable, '-c', code], cwd=directory, env=env, capture_output=True, text=True,
+                            check=True).stdout
+    assert output.strip() == '[]'
+
+def test_resampled_batch_reports_failures_per_ticker(fake_download, monkeypatch):
+    fake_download({'AAA': ('2023-01-01', '2024-06-01')})
+    load_data = lambda_atr_trailing_stop.load_data
+
+    def failing_load_data(ticker, *args):
+        if ticker == 'BAD':
+            raise ValueError("no stored feed")
+        return load_data(ticker, '2024-01-01', '2024-06-01')
+
+    monkeypatch.setattr(lambda_atr_trailing_stop, 'load_data', failing_load_data)
+    _, body = batch(['AAA', 'BAD'], interval='1wk', resample_from='1d')
+
+    assert body['AAA']['statusCode'] == 200
+    assert body['BAD']['statusCode'] == 502
+    assert 'no stored feed' in body['BAD']['error']
+
+def test_tickers_must_be_a_list(fake_download):
+    fake_download({'AAA': ('2023-01-01', '2024-06-01')})
+
+    status, body = batch('AAA')
+
+    assert status == 400
+    assert 'tickers' in body['error']
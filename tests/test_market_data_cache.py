@@ -0,0 +1,51 @@
+import pandas as pd
+
+import market_data_cache
+
+def test_multi_ticker_index_is_sorted_with_empty_and_offset_symbols(fake_download):
+    fake_download({'NEW': ('2024-03-01', '2024-04-30'), 'OLD': ('2024-01-01', '2024-04-30')})
+    # Cache NEW first so its March bars are concatenated ahead of OLD's February bars
+    market_data_cache.download('NEW', start='2024-02-01', end='2024-04-15')
+
+    data = market_data_cache.download(['NEW', 'NEVER', 'OLD'], start='2024-02-01', end='2024-04-15')
+
+    assert data.index.is_monotonic_increasing
+    assert data.index.is_unique
+    assert data['Close']['NEVER'].isna().all()
+    old = market_data_cache.download('OLD', start='2024-02-01', end='2024-04-15')
+    assert data['Close']['OLD'].dropna().equals(old['Close'])
+
+def test_head_segment_without_sessions_is_fetched_once(fake_download):
+    downloader = fake_download({'AAA': ('2024-01-02', '2024-04-30')})
+    market_data_cache.download('AAA', start='2024-01-02', end='2024-02-01')
+
+    # 2023-12-30 to 2024-01-01 is a weekend and New Year's Day
+    for _ in range(3):
+        data = market_data_cache.download('AAA', start='2023-12-30', end='2024-02-01')
+
+    assert len(downloader.calls) == 1
+    assert data.index[0] == pd.Timestamp('2024-01-02')
+
+def test_head_segment_before_listing_is_fetched_once(fake_download):
+    downloader = fake_download({'NEW': ('2024-03-01', '2024-04-30')})
+    # February came back without bars in a successful fetch, so NEW listed in March
+    market_data_cache.download('NEW', start='2024-02-01', end='2024-04-01')
+
+    for _ in range(3):
+        data = market_data_cache.download('NEW', start='2024-01-02', end='2024-04-01')
+
+    assert len(downloader.calls) == 2
+    assert data.index[0] == pd.Timestamp('2024-03-01')
+
+def test_failed_head_segment_is_fetched_again(fake_download):
+    downloader = fake_download({'AAA': ('2023-01-02', '2024-04-30')})
+    market_data_cache.download('AAA', start='2024-03-01', end='2024-04-01')
+
+    # An empty answer that may be a failure is not trusted
+    listings, downloader.listings = downloader.listings, {}
+    market_data_cache.download('AAA', start='2024-02-01', end='2024-04-01')
+    downloader.listings = listings
+    data = market_data_cache.download('AAA', start='2024-02-01', end='2024-04-01')
+
+    assert len(downloader.calls) == 3
+    assert data.index[0] == pd.Timestamp('2024-02-01')
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import trading_calendar
+from result_cache import MARKET_TZ, ResultCache, expiry_for, next_market_open
+
+CALENDAR = trading_calendar.TradingCalendar.from_rules('2024-01-01', '2025-01-01')
+
+@pytest.mark.parametrize('now, expected', [
+    (datetime(2024, 7, 3, 17, 0), datetime(2024, 7, 5, 9, 30)),      # Independence Day
+    (datetime(2024, 3, 28, 18, 0), datetime(2024, 4, 1, 9, 30)),     # Good Friday and the weekend
+    (datetime(2024, 7, 4, 10, 0), datetime(2024, 7, 5, 9, 30)),      # During hours of a holiday
+    (datetime(2024, 7, 5, 8, 0), datetime(2024, 7, 5, 9, 30)),       # Before the open
+])
+def test_next_market_open_skips_holidays(now, expected):
+    assert next_market_open(now.replace(tzinfo=MARKET_TZ), CALENDAR) == expected.replace(tzinfo=MARKET_TZ)
+
+def test_live_range_on_a_holiday_is_kept_until_the_next_open():
+    now = datetime(2024, 7, 4, 11, 0, tzinfo=MARKET_TZ)
+
+    assert expiry_for('2024-07-05', timedelta(minutes=5), now, CALENDAR) == datetime(2024, 7, 5, 9, 30, tzinfo=MARKET_TZ)
+    assert expiry_for('2024-07-03', timedelta(minutes=5), now, CALENDAR) is None
+
+def test_get_or_compute_keys_on_the_version_after_computing():
+    cache = ResultCache()
+    version = [1]
+
+    def compute():
+        version[0] += 1
+        return 'result'
+
+    assert cache.get_or_compute(('key',), compute, '2024-01-01', version=lambda: version[0]) == 'result'
+    assert cache.get_or_compute(('key',), compute, '2024-01-01', version=lambda: version[0]) == 'result'
+    assert version[0] == 2
+    assert cache.stats()['hits'] == 1
+
+def test_get_or_compute_does_not_cache_none():
+    cache = ResultCache()
+    results = [None, 'result']
+
+    assert cache.get_or_compute(('key',), lambda: results.pop(0), '2024-01-01') is None
+    assert cache.get_or_compute(('key',), lambda: results.pop(0), '2024-01-01') == 'result'
+    assert cache.stats()['entries'] == 1
+
+def test_default_calendar_needs_no_market_data(monkeypatch):
+    import market_data_cache
+
+    def download(*args, **kwargs):
+        raise AssertionError("expiry must not download market data")
+
+    monkeypatch.setattr(market_data_cache, 'download', download)
+    now = datetime(2024, 7, 3, 17, 0, tzinfo=MARKET_TZ)
+
+    assert next_market_open(now) == datetime(2024, 7, 5, 9, 30, tzinfo=MARKET_TZ)
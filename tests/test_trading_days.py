@@ -0,0 +1,29 @@
+import pytest
+
+import business_logic
+import get_symbol_price
+import trading_calendar
+from trading_days import verify_trading_days
+
+def test_dates_outside_the_calendar_do_not_abort_the_batch(fake_download):
+    downloader = fake_download({'AAA': ('2024-01-02', '2024-04-30')})
+    calendar = trading_calendar.TradingCalendar.from_rules('1980-01-01', '2026-01-01')
+
+    result = verify_trading_days([('AAA', '1975-06-02'), ('AAA', '2024-03-05'), ('AAA', '2024-07-04'),
+                                  ('AAA', '2030-06-03'), ('AAA', '2030-06-01')], calendar=calendar)
+
+    assert list(result['Reason']) == ['out of range', 'traded', 'holiday', 'out of range', 'weekend']
+    assert list(result['Trading Day']) == [False, True, False, False, False]
+    # Only the in-range session is fetched
+    assert len(downloader.calls) == 1
+    assert downloader.calls[0][2] <= calendar.end
+
+@pytest.mark.parametrize('is_market_open', [get_symbol_price.is_market_open, business_logic.is_market_open])
+def test_is_market_open_is_false_outside_the_calendar(is_market_open, monkeypatch):
+    calendar = trading_calendar.TradingCalendar.from_rules('1980-01-01', '2026-01-01')
+    monkeypatch.setattr(trading_calendar, 'get_calendar', lambda reference='SPY': calendar)
+
+    assert is_market_open('2024-03-05')
+    assert not is_market_open('2024-07-04')
+    assert not is_market_open('1975-06-02')
+    assert not is_market_open('2030-06-03')
@@ -0,0 +1,183 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Full-day NYSE closures that no weekday/holiday rule predicts
+SPECIAL_CLOSURES = [
+    '1985-09-27',                                        # Hurricane Gloria
+    '1994-04-27',                                        # President Nixon's funeral
+    '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14',
+    '2004-06-11',                                        # President Reagan's funeral
+    '2007-01-02',                                        # President Ford's funeral
+    '2012-10-29', '2012-10-30',                          # Hurricane Sandy
+    '2018-12-05',                                        # President G. H. W. Bush's funeral
+    '2025-01-09',                                        # President Carter's funeral
+]
+
+def nth_weekday(year, month, weekday, n):
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+def last_weekday(year, month, weekday):
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+# Function to find Easter Sunday (anonymous Gregorian algorithm)
+def easter(year):
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+# Function to move a fixed-date holiday to the weekday it is observed on
+def observed(day):
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+# Function to list the NYSE full-day holidays of a year from the exchange's rules
+def nyse_holidays(year):
+    holidays = [
+        nth_weekday(year, 2, 0, 3),                      # Washington's Birthday / Presidents' Day
+        easter(year) - timedelta(days=2),                # Good Friday
+        last_weekday(year, 5, 0),                        # Memorial Day
+        observed(date(year, 7, 4)),                      # Independence Day
+        nth_weekday(year, 9, 0, 1),                      # Labor Day
+        nth_weekday(year, 11, 3, 4),                     # Thanksgiving
+        observed(date(year, 12, 25)),                    # Christmas
+    ]
+    # New Year's Day on a Saturday is not observed on the Friday before
+    if date(year, 1, 1).weekday() != 5:
+        holidays.append(observed(date(year, 1, 1)))
+    if year >= 1998:
+        holidays.append(nth_weekday(year, 1, 0, 3))      # Martin Luther King Jr. Day
+    if year >= 2022:
+        holidays.append(observed(date(year, 6, 19)))     # Juneteenth
+    return holidays
+
+# Function to derive the session dates in [start, end) from the holiday rules
+def rule_sessions(start, end):
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D'))
+    holidays = [day for year in range(start.year, end.year + 1) for day in nyse_holidays(year)]
+    closed = np.array(holidays + SPECIAL_CLOSURES, dtype='datetime64[D]')
+    return days[np.is_busday(days) & ~np.isin(days, closed)]
+
+# Function to normalise a date, string or array of them to datetime64[D].
+# Returns the days plus whether the input was a single value.
+def to_days(dates):
+    # 'YYYY-MM-DD' strings are the common case and parse far faster in numpy
+    if isinstance(dates, str):
+        return np.datetime64(dates[:10], 'D'), True
+    converted = pd.to_datetime(dates)
+    if isinstance(converted, pd.Timestamp):
+        return np.datetime64(converted.tz_localize(None) if converted.tzinfo else converted, 'D'), True
+    converted = pd.DatetimeIndex(converted)
+    converted = converted.tz_localize(None) if converted.tz else converted
+    return converted.values.astype('datetime64[D]'), False
+
+# Exchange session calendar over a fixed date span.
+# Sessions are kept twice: as a sorted datetime64[D] array for range and
+# next/previous queries (binary search), and as a bitset with one bit per
+# calendar day for O(1) membership tests, scalar or vectorized.
+class TradingCalendar:
+    def __init__(self, sessions, start, end):
+        """
+        :param sessions: Session dates inside [start, end)
+        :param start: First calendar day covered
+        :param end: Calendar day after the last one covered
+        """
+        self.start = np.datetime64(start, 'D')
+        self.end = np.datetime64(end, 'D')
+        self.sessions = np.unique(np.asarray(sessions, dtype='datetime64[D]'))
+        self.sessions = self.sessions[(self.sessions >= self.start) & (self.sessions < self.end)]
+
+        flags = np.zeros((self.end - self.start).astype(int), dtype=bool)
+        flags[(self.sessions - self.start).astype(int)] = True
+        self.bits = np.packbits(flags, bitorder='little')
+
+    # Calendar built from the holiday rules alone, no data needed
+    @classmethod
+    def from_rules(cls, start='1980-01-01', end=None):
+        start = pd.Timestamp(start).date()
+        end = pd.Timestamp(end).date() if end else date(date.today().year + 2, 1, 1)
+        return cls(rule_sessions(start, end), start, end)
+
+    # Calendar built from the days a continuously traded symbol has bars in the
+    # market data cache; days before or after its history fall back to the rules
+    @classmethod
+    def from_history(cls, symbol='SPY', start='1980-01-01', end=None):
+        import market_data_cache
+
+        calendar = cls.from_rules(start, end)
+        history = market_data_cache.download(symbol, start=str(calendar.start), end=str(calendar.end))
+        if history.empty:
+            return calendar
+
+        traded, _ = to_days(history.index)
+        rules = calendar.sessions
+        sessions = np.concatenate([rules[rules < traded[0]], traded, rules[rules > traded[-1]]])
+        return cls(sessions, calendar.start, calendar.end)
+
+    def offsets(self, dates):
+        days, scalar = to_days(dates)
+        if np.any((days < self.start) | (days >= self.end)):
+            raise ValueError(f"Date outside the calendar range {self.start} to {self.end - 1}.")
+        return (days - self.start).astype(np.int64), scalar
+
+    def is_session(self, dates):
+        """
+        :param dates: A date or an array-like of dates
+        :return: Whether each date is a trading session, bool or bool array
+        """
+        offsets, scalar = self.offsets(dates)
+        flags = (self.bits[offsets >> 3] >> (offsets & 7)) & 1
+        return bool(flags) if scalar else flags.astype(bool)
+
+    # Function to list the sessions in [start, end)
+    def sessions_between(self, start, end):
+        start, _ = to_days(start)
+        end, _ = to_days(end)
+        return self.sessions[np.searchsorted(self.sessions, start):np.searchsorted(self.sessions, end)]
+
+    # Function to count the sessions in [start, end) for scalar or paired arrays of bounds
+    def session_count(self, start, end):
+        start, _ = to_days(start)
+        end, _ = to_days(end)
+        return np.searchsorted(self.sessions, end) - np.searchsorted(self.sessions, start)
+
+    def next_session(self, dates):
+        """
+        :return: The first session strictly after each date
+        """
+        days, _ = to_days(dates)
+        index = np.searchsorted(self.sessions, days, side='right')
+        if np.any(index >= len(self.sessions)):
+            raise ValueError(f"No session after {self.sessions[-1]} in the calendar.")
+        return self.sessions[index]
+
+    def previous_session(self, dates):
+        """
+        :return: The last session strictly before each date
+        """
+        days, _ = to_days(dates)
+        index = np.searchsorted(self.sessions, days, side='left') - 1
+        if np.any(index < 0):
+            raise ValueError(f"No session before {self.sessions[0]} in the calendar.")
+        return self.sessions[index]
+
+# Function to get the process-wide calendar, built once from the cached SPY history
+@lru_cache(maxsize=None)
+def get_calendar(reference='SPY'):
+    if reference is None:
+        return TradingCalendar.from_rules()
+    return TradingCalendar.from_history(reference)
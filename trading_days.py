@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+import market_data_cache
+import trading_calendar
+
+REASONS = ['traded', 'weekend', 'holiday', 'not yet listed', 'no trade', 'out of range']
+
+# Function to verify many (symbol, date) pairs at once.
+# Weekends and holidays are answered from the trading calendar without any data;
+# weekdays outside the calendar's span are 'out of range' and never fetched.
+# The remaining pairs are grouped by symbol; symbols are sorted by the start of
+# their span and downloaded `chunk_size` at a time over the chunk's joint span,
+# so every symbol is fetched once. Each date is then looked up in the symbol's
+# sorted array of traded days.
+def verify_trading_days(pairs, calendar=None, chunk_size=100, lookback_days=7):
+    """
+    :param pairs: Iterable of (symbol, date) tuples, or a frame with Symbol and Date columns
+    :param calendar: TradingCalendar, defaults to trading_calendar.get_calendar()
+    :param chunk_size: Symbols per multi-ticker download
+    :param lookback_days: Extra days fetched before a symbol's earliest date, so a
+        missing bar can be told apart from a symbol that was not listed yet
+    :return: Frame with Symbol, Date, Trading Day and Reason per pair, in input order.
+        A session before the symbol's first bar is 'not yet listed' when that bar comes
+        after the start of the fetched span; any other session without a bar is 'no trade'.
+    """
+    if not isinstance(pairs, pd.DataFrame):
+        pairs = pd.DataFrame(list(pairs), columns=['Symbol', 'Date'])
+    symbols = pairs['Symbol'].to_numpy(dtype=object)
+    days, _ = trading_calendar.to_days(pairs['Date'])
+    calendar = calendar or trading_calendar.get_calendar()
+
+    reasons = np.full(len(pairs), 'no trade', dtype=object)
+    weekend = ~np.is_busday(days)
+    out_of_range = ~weekend & ((days < calendar.start) | (days >= calendar.end))
+    holiday = np.zeros(len(days), dtype=bool)
+    checked = ~weekend & ~out_of_range
+    holiday[checked] = ~calendar.is_session(days[checked])
+    reasons[weekend] = 'weekend'
+    reasons[holiday] = 'holiday'
+    reasons[out_of_range] = 'out of range'
+
+    # Only sessions need market data, one span per symbol
+    sessions = pd.DataFrame({'Symbol': symbols, 'Day': days})[checked & ~holiday]
+    spans = sessions.groupby('Symbol')['Day'].agg(['min', 'max']).sort_values('min')
+    groups = sessions.groupby('Symbol').indices
+
+    for i in range(0, len(spans), chunk_size):
+        chunk = spans.iloc[i:i + chunk_size]
+        start = chunk['min'].min() - np.timedelta64(lookback_days, 'D')
+        end = chunk['max'].max() + np.timedelta64(1, 'D')
+        data = market_data_cache.download(list(chunk.index), start=str(start), end=str(end))
+
+        for symbol in chunk.index:
+            close = data['Close'][symbol].dropna()
+            traded_days = close.index.values.astype('datetime64[D]')
+            rows = sessions.index[groups[symbol]]
+            requested = days[rows]
+
+            position = np.searchsorted(traded_days, requested)
+            traded = position < len(traded_days)
+            traded[traded] = traded_days[position[traded]] == requested[traded]
+            reasons[rows[traded]] = 'traded'
+            if len(traded_days) and traded_days[0] > spans.at[symbol, 'min'] - np.timedelta64(lookback_days, 'D'):
+                reasons[rows[~traded & (requested < traded_days[0])]] = 'not yet listed'
+
+    return pd.DataFrame({
+        'Symbol': symbols,
+        'Date': pd.DatetimeIndex(days),
+        'Trading Day': reasons == 'traded',
+        'Reason': pd.Categorical(reasons, categories=REASONS),
+    }, index=pairs.index)